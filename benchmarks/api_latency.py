@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API latency of GET /projects/{id}/status while uploads run.
+
+Runs against a live API (uvicorn with its Postgres, Redis and MinIO;
+Celery workers are not needed, dispatched tasks just wait in the queue).
+It creates a small project, then measures the status endpoint from
+--probes concurrent clients, first with the API idle and then while
+--uploads clients keep posting --upload-mb base tracks. With blocking
+storage/broker calls on the event loop the loaded percentiles grow by
+roughly the time an upload takes to reach storage; with them offloaded
+(src/api/offload.py) they stay near the idle ones.
+
+The projects created are deleted at the end (disable with --keep).
+
+Usage:
+    python -m benchmarks.api_latency --base-url http://localhost:8000
+    python -m benchmarks.api_latency --uploads 8 --upload-mb 80 --seconds 30
+"""
+import argparse
+import http.client
+import io
+import json
+import threading
+import time
+import uuid
+import wave
+from urllib.parse import urlparse
+
+import numpy as np
+
+API = "/api/v1"
+
+
+def silent_wav(megabytes: float, sample_rate: int = 44100) -> bytes:
+    """Valid 16-bit stereo WAV of silence, about the given size."""
+    frames = int(megabytes * 1024 * 1024 / 4)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(bytes(frames * 4))
+    return buffer.getvalue()
+
+
+class Client:
+    """Keep-alive HTTP connection to the API (one per thread)."""
+
+    def __init__(self, base_url: str, timeout: float = 300):
+        url = urlparse(base_url)
+        self.conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None):
+        self.conn.request(method, API + path, body=body, headers=headers or {})
+        response = self.conn.getresponse()
+        data = response.read()
+        return response.status, data
+
+    def upload(self, filename: str, data: bytes) -> str:
+        boundary = uuid.uuid4().hex
+        body = b"".join([
+            f"--{boundary}\r\n".encode(),
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'.encode(),
+            b"Content-Type: audio/wav\r\n\r\n",
+            data,
+            f"\r\n--{boundary}--\r\n".encode(),
+        ])
+        status, payload = self.request(
+            "POST", "/upload/base-track", body,
+            {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        )
+        if status != 200:
+            raise RuntimeError(f"Upload failed ({status}): {payload[:200]!r}")
+        return json.loads(payload)["project_id"]
+
+    def close(self):
+        self.conn.close()
+
+
+def probe(base_url: str, project_id: str, stop: threading.Event, latencies: list):
+    client = Client(base_url)
+    while not stop.is_set():
+        start = time.perf_counter()
+        status, _ = client.request("GET", f"/projects/{project_id}/status")
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f"Status request failed ({status})")
+    client.close()
+
+
+def uploader(base_url: str, data: bytes, stop: threading.Event, created: list, durations: list):
+    client = Client(base_url)
+    while not stop.is_set():
+        start = time.perf_counter()
+        # Unique names: each upload is a new project (identical content is
+        # still stored and hashed, only separation is deduplicated)
+        created.append(client.upload(f"bench-{uuid.uuid4().hex[:8]}.wav", data))
+        durations.append(time.perf_counter() - start)
+    client.close()
+
+
+def phase(base_url: str, project_id: str, probes: int, seconds: float,
+          uploads: int = 0, data: bytes = b"", created: list = None):
+    stop = threading.Event()
+    latencies, durations = [], []
+    threads = [
+        threading.Thread(target=probe, args=(base_url, project_id, stop, latencies))
+        for _ in range(probes)
+    ] + [
+        threading.Thread(target=uploader, args=(base_url, data, stop, created, durations))
+        for _ in range(uploads)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies) * 1000, durations
+
+
+def report(name: str, latencies: np.ndarray, seconds: float):
+    print(
+        f"  {name:<8} {len(latencies) / seconds:7.0f} req/s  "
+        f"p50 {np.percentile(latencies, 50):7.1f} ms  "
+        f"p99 {np.percentile(latencies, 99):7.1f} ms  "
+        f"max {latencies.max():7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--probes", type=int, default=8, help="Concurrent status clients")
+    parser.add_argument("--uploads", type=int, default=4, help="Concurrent uploading clients")
+    parser.add_argument("--upload-mb", type=float, default=50.0)
+    parser.add_argument("--seconds", type=float, default=20.0, help="Duration of each phase")
+    parser.add_argument("--keep", action="store_true", help="Keep the projects created")
+    args = parser.parse_args()
+
+    created = []
+    client = Client(args.base_url)
+    project_id = client.upload("bench-status.wav", silent_wav(0.1))
+    created.append(project_id)
+    data = silent_wav(args.upload_mb)
+
+    print(
+        f"{args.probes} status clients; loaded phase adds {args.uploads} clients "
+        f"uploading {args.upload_mb:.0f} MB each ({args.seconds:.0f}s per phase)"
+    )
+    try:
+        idle, _ = phase(args.base_url, project_id, args.probes, args.seconds)
+        report("idle", idle, args.seconds)
+        loaded, durations = phase(
+            args.base_url, project_id, args.probes, args.seconds,
+            uploads=args.uploads, data=data, created=created
+        )
+        report("uploads", loaded, args.seconds)
+        if durations:
+            print(f"  {len(durations)} uploads, mean {np.mean(durations):.2f}s each")
+    finally:
+        if not args.keep:
+            for pid in created:
+                client.request("DELETE", f"/projects/{pid}")
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
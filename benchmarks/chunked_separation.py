@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunk-parallel vs. whole-file Demucs separation.
+
+On a separation worker environment, separates the same track whole and
+as chunks (chunk_bounds + whole-track normalization + stitch_chunks,
+exactly as separate_chunk/stitch_stems do) and compares:
+  - SDR of the chunked stems against the whole-file stems, overall and
+    within +-1 s of each seam; the run fails below --min-sdr dB
+  - whole-file time vs. the per-chunk times, and the wall time projected
+    for 1..N separation workers (chunks run in parallel, then stitching)
+
+The stitching itself and the seam tolerance are tested in
+tests/test_chunked_separation.py.
+
+Usage:
+    python -m benchmarks.chunked_separation --input song.wav --chunk-seconds 60
+    python -m benchmarks.chunked_separation --seconds 300 --workers 4
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from src.config.settings import get_settings
+from src.services.stem_separator import chunk_bounds, normalization_stats, stitch_chunks
+from tests.separation_fixtures import sdr, synthetic_track
+
+settings = get_settings()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", help="Audio file (default: synthetic track)")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Synthetic track length")
+    parser.add_argument("--chunk-seconds", type=float, default=settings.DEMUCS_CHUNK_SECONDS or 120)
+    parser.add_argument("--overlap-seconds", type=float, default=settings.DEMUCS_CHUNK_OVERLAP_SECONDS)
+    parser.add_argument("--workers", type=int, default=4, help="Largest worker count to project")
+    parser.add_argument("--min-sdr", type=float, default=30.0, help="Minimum seam SDR vs. whole file (dB)")
+    args = parser.parse_args()
+
+    from src.services.stem_separator import StemSeparator
+
+    separator = StemSeparator()
+    sample_rate = separator.sample_rate
+    if args.input:
+        wav = separator.load(args.input)
+    else:
+        wav = synthetic_track(args.seconds, sample_rate)
+
+    bounds = chunk_bounds(
+        wav.shape[1],
+        int(args.chunk_seconds * sample_rate),
+        int(args.overlap_seconds * sample_rate)
+    )
+    if len(bounds) < 2:
+        raise SystemExit("Track fits in one chunk: lower --chunk-seconds")
+
+    start = time.perf_counter()
+    whole = separator.separate_array(wav)
+    whole_time = time.perf_counter() - start
+
+    stats = normalization_stats(wav)
+    chunk_stems, chunk_times = [], []
+    for s, e in bounds:
+        start = time.perf_counter()
+        chunk_stems.append(separator.separate_array(np.ascontiguousarray(wav[:, s:e]), stats))
+        chunk_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    fade = int(args.overlap_seconds * sample_rate) // 2
+    stitched = {
+        name: stitch_chunks([chunk[name] for chunk in chunk_stems], bounds, fade)
+        for name in whole
+    }
+    stitch_time = time.perf_counter() - start
+
+    seams = [s for s, _ in bounds[1:]]
+    near_seams = np.zeros(wav.shape[1], dtype=bool)
+    for seam in seams:
+        centre = seam + int(args.overlap_seconds * sample_rate) // 2
+        near_seams[max(centre - sample_rate, 0):centre + sample_rate] = True
+
+    print(
+        f"{wav.shape[1] / sample_rate:.0f}s track, {len(bounds)} chunks of "
+        f"<= {args.chunk_seconds:.0f}s, {args.overlap_seconds:.0f}s overlap"
+    )
+    worst = math.inf
+    for name in whole:
+        overall = sdr(whole[name], stitched[name])
+        seam = sdr(whole[name][near_seams], stitched[name][near_seams])
+        worst = min(worst, seam)
+        print(f"  {name:<7} SDR vs whole file: overall {overall:6.1f} dB, at seams {seam:6.1f} dB")
+
+    print(f"  whole file:      {whole_time:7.1f}s")
+    print(f"  chunks (serial): {sum(chunk_times):7.1f}s  (max chunk {max(chunk_times):.1f}s)")
+    mean_chunk = float(np.mean(chunk_times))
+    for workers in range(1, args.workers + 1):
+        wall = math.ceil(len(bounds) / workers) * mean_chunk + stitch_time
+        print(f"  {workers} worker(s) projected: {wall:7.1f}s  ({whole_time / wall:.1f}x)")
+
+    assert worst >= args.min_sdr, f"Seam SDR {worst:.1f} dB below {args.min_sdr} dB"
+    print(f"Tolerance: OK (seam SDR >= {args.min_sdr} dB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pickled list of Grain objects vs. columnar GrainLibrary bytes.
+
+Reports payload size and load time for a synthetic library.
+
+Usage:
+    python -m benchmarks.grain_library_format --grains 5000
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from src.services.grain_builder import Grain, GrainLibrary
+
+
+def timed(fn, repeat: int = 5) -> float:
+    """Best-of-N wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grains", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    grains = [
+        Grain(
+            audio=rng.standard_normal(int(rng.integers(512, 8000))).astype(np.float32),
+            pitch=float(rng.uniform(30, 2000)),
+            rms=float(rng.uniform(0, 1))
+        )
+        for _ in range(args.grains)
+    ]
+
+    pickled = pickle.dumps(grains)
+    library = GrainLibrary.from_grains(grains)
+    packed = library.to_bytes()
+
+    loaded = GrainLibrary.from_bytes(packed)
+    for i in rng.integers(0, args.grains, size=50):
+        assert np.array_equal(loaded[i].audio, grains[i].audio)
+        assert loaded[i].pitch == grains[i].pitch
+
+    print(f"{args.grains} grains, {len(library.samples)} samples")
+    print(f"pickle:       {len(pickled) / 1e6:8.2f} MB  load {timed(lambda: pickle.loads(pickled)):8.2f} ms")
+    print(f"GrainLibrary: {len(packed) / 1e6:8.2f} MB  load {timed(lambda: GrainLibrary.from_bytes(packed)):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark: nearest-pitch grain selection, linear scan vs. GrainIndex.
+
+Times GrainIndex against the original
+``min(library, key=lambda g: abs(g.pitch - target))`` scan. That both
+pick the same grains (ties and duplicated pitches included) is tested
+in tests/test_grain_index.py.
+
+Usage:
+    python -m benchmarks.grain_selection --grains 5000 --onsets 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.services.grain_index import GrainIndex
+from tests.grain_index_reference import linear_scan
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grains", type=int, default=5000)
+    parser.add_argument("--onsets", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pitches = [float(p) for p in rng.uniform(30.0, 2000.0, size=args.grains)]
+    targets = rng.uniform(30.0, 2000.0, size=args.onsets)
+
+    start = time.perf_counter()
+    expected = [linear_scan(pitches, float(t)) for t in targets]
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = GrainIndex(pitches)
+    selected = index.nearest(targets)
+    index_time = time.perf_counter() - start
+
+    assert selected.tolist() == expected
+    print(f"{args.grains} grains x {args.onsets} onsets")
+    print(f"linear scan: {linear_time * 1000:9.2f} ms")
+    print(f"GrainIndex:  {index_time * 1000:9.2f} ms  ({linear_time / index_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
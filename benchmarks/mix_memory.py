@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak RSS of the create_mix render path per processing dtype.
+
+Each dtype runs in a fresh subprocess that renders three synthesized
+stems plus vocals for a synthetic track, mixes, normalizes and exports
+it, then reports its peak resident set size. float64 reproduces the
+buffers the pipeline used before AUDIO_DTYPE existed.
+
+Usage:
+    python -m benchmarks.mix_memory --minutes 5
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+
+
+def render(minutes: float, dtype: str):
+    """Run synthesis + mix + export once with the given dtype."""
+    from src.services.grain_builder import Grain, GrainLibrary
+    from src.services.granular_synth import GranularSynthesizer
+    from src.services.mixer import AudioMixer
+
+    rng = np.random.default_rng(0)
+    n = int(minutes * 60 * SAMPLE_RATE)
+
+    library = GrainLibrary.from_grains([
+        Grain(
+            audio=rng.standard_normal(int(rng.integers(1024, 8000))).astype(np.float32),
+            pitch=float(rng.uniform(40, 800)),
+            rms=0.5
+        )
+        for _ in range(500)
+    ])
+
+    synth = GranularSynthesizer(seed=0, dtype=dtype)
+    stems = {"vocals": rng.standard_normal(n).astype(dtype)}
+    for name in ("drums", "bass", "other"):
+        base = rng.standard_normal(n).astype(dtype)
+        starts = np.arange(0, n, SAMPLE_RATE // 6)
+        onset_table = [
+            {"start": int(s), "pitch": float(rng.uniform(40, 800)), "peak": 0.8}
+            for s in starts
+        ]
+        stems[name] = synth.synthesize(base, library, onset_table=onset_table)
+        del base
+
+    mixed = AudioMixer.normalize(AudioMixer.mix(stems, dtype=dtype))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        AudioMixer.export(mixed, os.path.join(tmpdir, "mix.wav"))
+
+    # ru_maxrss is in KiB on Linux
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--child", choices=["float32", "float64"])
+    args = parser.parse_args()
+
+    if args.child:
+        render(args.minutes, args.child)
+        return
+
+    print(f"Track: {args.minutes:.1f} min @ {SAMPLE_RATE} Hz")
+    for dtype in ("float64", "float32"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.mix_memory",
+             "--minutes", str(args.minutes), "--child", dtype],
+            check=True, capture_output=True, text=True
+        )
+        peak_kib = int(out.stdout.strip().splitlines()[-1])
+        print(f"{dtype}: peak RSS {peak_kib / 1024:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: render cost and quality of each MixSettings combination.
+
+For every (grain_duration_ms, use_pitch_mapping, use_envelope) on a
+synthetic bass stem and grain library it reports:
+  - cold: render with no cached analysis (onset detection, plus the pYIN
+    pass when pitch mapping is on) as render_stem does on a miss
+  - warm: render from a cached onset table
+  - pitch error: median |cents| between the onset pitch and the chosen
+    grain's pitch (voiced onsets only)
+  - edge: mean grain amplitude at the cut point relative to its peak
+    (0 = no click at the grain end)
+
+These numbers back the "fast" preset and the defaults of MixSettings
+in src/api/v1/mix/schemas.py.
+
+Usage:
+    python -m benchmarks.mix_settings --seconds 30
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from benchmarks.pitch_analysis import synthetic_stem
+from src.services.grain_builder import Grain, GrainLibrary
+from src.services.granular_synth import GranularSynthesizer
+from src.tasks.analysis import analyze_stem_audio
+
+SAMPLE_RATE = 44100
+
+
+def synthetic_library(n: int = 400) -> GrainLibrary:
+    """Harmonic grains with known pitch between E1 and E5."""
+    rng = np.random.default_rng(1)
+    grains = []
+    for _ in range(n):
+        pitch = 41.2 * 2 ** (rng.uniform(0, 48) / 12)
+        t = np.arange(int(rng.integers(1024, 8000))) / SAMPLE_RATE
+        audio = np.sin(2 * np.pi * pitch * t) + 0.3 * np.sin(4 * np.pi * pitch * t)
+        grains.append(Grain(audio=audio.astype(np.float32), pitch=float(pitch), rms=0.5))
+    return GrainLibrary.from_grains(grains)
+
+
+def measure(audio, library, tables, grain_ms, pitch, envelope):
+    synth = GranularSynthesizer(
+        grain_duration_ms=grain_ms,
+        use_pitch_mapping=pitch,
+        use_envelope=envelope
+    )
+
+    start = time.perf_counter()
+    if pitch:
+        table = analyze_stem_audio(audio, window_ms=grain_ms)["pitch_data"]
+        synth.synthesize(audio, library, onset_table=table, seed=0)
+    else:
+        synth.synthesize(audio, library, seed=0)
+    cold = time.perf_counter() - start
+
+    # Cached analysis, as stored under analysis_cache_key()
+    if grain_ms not in tables:
+        tables[grain_ms] = analyze_stem_audio(audio, window_ms=grain_ms)["pitch_data"]
+    table = tables[grain_ms]
+    start = time.perf_counter()
+    synth.synthesize(audio, library, onset_table=table, seed=0)
+    warm = time.perf_counter() - start
+
+    targets = [entry["pitch"] if pitch else 0.0 for entry in table]
+    grain_ids = library.index.select(targets, np.random.default_rng(0))
+    voiced = np.array([entry["pitch"] for entry in table]) > 0
+    chosen = library.pitches[grain_ids]
+    onset_pitch = np.array([entry["pitch"] for entry in table])
+    cents = np.abs(1200 * np.log2(chosen[voiced] / onset_pitch[voiced]))
+
+    # Last sample of each chosen grain as placed (before amplitude)
+    edges = np.abs(synth._render_grains(library, grain_ids)[:, -1])
+    return cold, warm, float(np.median(cents)), float(np.mean(edges))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    audio = synthetic_stem(args.seconds)
+    library = synthetic_library()
+    tables = {}
+    print(f"Stem: {args.seconds:.0f}s, library: {len(library)} grains")
+    print(f"{'grain ms':>8} {'pitch':>6} {'env':>5} {'cold s':>8} {'warm s':>8} {'cents':>8} {'edge':>6}")
+
+    for grain_ms, pitch, envelope in itertools.product((60, 120, 200), (True, False), (True, False)):
+        cold, warm, cents, edge = measure(audio, library, tables, grain_ms, pitch, envelope)
+        print(
+            f"{grain_ms:>8} {str(pitch):>6} {str(envelope):>5} "
+            f"{cold:8.3f} {warm:8.3f} {cents:8.1f} {edge:6.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
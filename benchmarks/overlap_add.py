@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: grain placement, per-onset loop vs. the batched kernel.
+
+Times GranularSynthesizer.synthesize against the original loop (one
+processed grain + sliced ``+=`` per onset) over a dense onset table: the
+kernel once with the library's grain bank still to build (cold) and once
+with it pre-rendered (warm, as when the bank comes from the cache). That
+both produce the same samples is tested in tests/test_overlap_add.py.
+
+Usage:
+    python -m benchmarks.overlap_add --onsets 20000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.services.granular_synth import GranularSynthesizer
+from tests.overlap_add_reference import make_case, reference_loop
+
+SAMPLE_RATE = 44100
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--onsets", type=int, default=20000)
+    parser.add_argument("--minutes", type=float, default=5.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    n_samples = int(args.minutes * 60 * SAMPLE_RATE)
+    library, table = make_case(rng, n_samples, args.onsets)
+    base = np.zeros(n_samples, dtype=np.float32)
+    synth = GranularSynthesizer(seed=0)
+
+    start = time.perf_counter()
+    expected = reference_loop(synth, base, library, table, seed=0)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = synth.synthesize(base, library, onset_table=table, seed=0)
+    cold_time = time.perf_counter() - start
+    assert np.array_equal(got, expected)
+
+    start = time.perf_counter()
+    got = synth.synthesize(base, library, onset_table=table, seed=0)
+    warm_time = time.perf_counter() - start
+    assert np.array_equal(got, expected)
+
+    bank_mb = synth.grain_bank(library).nbytes / 1024 / 1024
+    print(f"{args.onsets} onsets over {args.minutes:.0f} min, {len(library)} grains")
+    print(f"  loop:               {loop_time:.3f}s")
+    print(f"  kernel, cold bank:  {cold_time:.3f}s  ({loop_time / cold_time:.1f}x)")
+    print(f"  kernel, warm bank:  {warm_time:.3f}s  ({loop_time / warm_time:.1f}x, bank {bank_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
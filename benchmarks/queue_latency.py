@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mix latency under a separation backlog, per queue topology.
+
+Starts local Celery workers (subprocesses) against a Redis broker, queues
+a backlog of separations and grain library builds, then submits mixes at
+a steady rate and reports the time from submission to completion. The
+tasks are stand-ins with the real task names that only sleep, so neither
+Demucs, Postgres nor MinIO is needed, only Redis.
+
+Topologies (--modes), all with the same total number of worker processes:
+  shared      one default queue consumed by every process (no routing)
+  queues      TASK_ROUTES queues, one worker each, priorities ignored
+  priorities  TASK_ROUTES queues and priorities (what celery_app uses)
+
+With one shared queue a mix waits for the separations queued before it;
+with dedicated queues only for the grain builds of its own queue, and
+with priorities not even for those.
+
+Use a Redis database of its own (the defaults are 14 and 15): the queues
+are purged before and after each run.
+
+Usage:
+    python -m benchmarks.queue_latency
+    python -m benchmarks.queue_latency --broker redis://localhost:6379/14 --separations 40
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import numpy as np
+from celery import Celery
+
+from src.tasks.celery_app import TASK_QUEUES, TASK_ROUTES, celery_app
+
+BROKER = os.environ.get("QUEUE_BENCH_BROKER", "redis://localhost:6379/14")
+BACKEND = os.environ.get("QUEUE_BENCH_BACKEND", "redis://localhost:6379/15")
+
+# Imported by the workers too (-A benchmarks.queue_latency:bench_app); the
+# topology is only in where messages are published and who consumes them
+bench_app = Celery("queue_bench", broker=BROKER, backend=BACKEND)
+bench_app.conf.update(
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    broker_transport_options=celery_app.conf.broker_transport_options,
+)
+
+QUEUES = ["celery"] + [queue.name for queue in TASK_QUEUES]
+
+
+@bench_app.task(name="tasks.separate_stems")
+def separate_stems(seconds: float):
+    time.sleep(seconds)
+
+
+@bench_app.task(name="tasks.build_grain_library")
+def build_grain_library(seconds: float):
+    time.sleep(seconds)
+
+
+@bench_app.task(name="tasks.create_mix")
+def create_mix(seconds: float) -> float:
+    time.sleep(seconds)
+    return time.time()
+
+
+def route(mode: str, name: str) -> dict:
+    """Publishing options of a task in a topology."""
+    if mode == "shared":
+        return {"queue": "celery"}
+    if mode == "queues":
+        return {"queue": TASK_ROUTES[name]["queue"]}
+    return TASK_ROUTES[name]
+
+
+def purge():
+    with bench_app.connection_for_write() as conn:
+        for name in QUEUES:
+            conn.default_channel.queue_purge(name)
+
+
+def worker_specs(mode: str, separation_workers: int, synthesis_workers: int) -> list[tuple]:
+    """(name, queues, concurrency) of the workers of a topology."""
+    if mode == "shared":
+        return [("shared", "celery", separation_workers + synthesis_workers)]
+    return [
+        ("separation", "separation", separation_workers),
+        ("synthesis", "synthesis", synthesis_workers),
+    ]
+
+
+def start_workers(specs: list[tuple]) -> list[subprocess.Popen]:
+    env = dict(os.environ, QUEUE_BENCH_BROKER=BROKER, QUEUE_BENCH_BACKEND=BACKEND)
+    workers = [
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "celery", "-A", "benchmarks.queue_latency:bench_app",
+                "worker", "-Q", queues, f"--concurrency={concurrency}",
+                "--prefetch-multiplier=1", "-n", f"{name}@%h", "--loglevel=warning",
+                "--without-gossip", "--without-mingle",
+            ],
+            env=env,
+        )
+        for name, queues, concurrency in specs
+    ]
+
+    deadline = time.monotonic() + 60
+    while len(bench_app.control.ping(timeout=1.0)) < len(specs):
+        if time.monotonic() > deadline:
+            stop_workers(workers)
+            raise RuntimeError("Workers did not start (is Redis running?)")
+    return workers
+
+
+def stop_workers(workers: list[subprocess.Popen]):
+    # Warm shutdown: running tasks finish, reserved messages are requeued
+    for worker in workers:
+        worker.send_signal(signal.SIGTERM)
+    for worker in workers:
+        worker.wait()
+
+
+def run(mode: str, args) -> np.ndarray:
+    """Mix latencies (ms) of one topology."""
+    purge()
+    workers = start_workers(worker_specs(mode, args.separation_workers, args.synthesis_workers))
+    try:
+        # Backlog queued before the first mix
+        for _ in range(args.separations):
+            separate_stems.apply_async((args.separation_seconds,), **route(mode, separate_stems.name))
+        for _ in range(args.grain_builds):
+            build_grain_library.apply_async((args.grain_seconds,), **route(mode, build_grain_library.name))
+
+        submitted = []
+        for _ in range(args.mixes):
+            start = time.time()
+            submitted.append((start, create_mix.apply_async((args.mix_seconds,), **route(mode, create_mix.name))))
+            time.sleep(args.mix_interval)
+
+        timeout = args.separations * args.separation_seconds + args.grain_builds * args.grain_seconds + 60
+        latencies = [result.get(timeout=timeout) - start for start, result in submitted]
+    finally:
+        purge()
+        stop_workers(workers)
+        purge()
+    return np.array(latencies) * 1000
+
+
+def report(name: str, latencies: np.ndarray):
+    print(
+        f"  {name:<10} "
+        f"p50 {np.percentile(latencies, 50):8.0f} ms  "
+        f"p90 {np.percentile(latencies, 90):8.0f} ms  "
+        f"p99 {np.percentile(latencies, 99):8.0f} ms  "
+        f"max {latencies.max():8.0f} ms"
+    )
+
+
+def main():
+    global BROKER, BACKEND
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--broker", default=BROKER, help="Redis database used as the broker")
+    parser.add_argument("--backend", default=BACKEND, help="Redis database for results")
+    parser.add_argument("--modes", nargs="+", default=["shared", "queues", "priorities"],
+                        choices=["shared", "queues", "priorities"])
+    parser.add_argument("--separation-workers", type=int, default=2, help="Processes for separations")
+    parser.add_argument("--synthesis-workers", type=int, default=2, help="Processes for mixes and grain builds")
+    parser.add_argument("--separations", type=int, default=16, help="Separations queued up front")
+    parser.add_argument("--separation-seconds", type=float, default=3.0)
+    parser.add_argument("--grain-builds", type=int, default=30, help="Grain builds queued up front")
+    parser.add_argument("--grain-seconds", type=float, default=0.3)
+    parser.add_argument("--mixes", type=int, default=40)
+    parser.add_argument("--mix-seconds", type=float, default=0.2)
+    parser.add_argument("--mix-interval", type=float, default=0.25, help="Seconds between mix submissions")
+    args = parser.parse_args()
+
+    BROKER, BACKEND = args.broker, args.backend
+    bench_app.conf.update(broker_url=BROKER, result_backend=BACKEND)
+
+    print(
+        f"{args.mixes} mixes of {args.mix_seconds}s every {args.mix_interval}s behind "
+        f"{args.separations} separations of {args.separation_seconds}s and "
+        f"{args.grain_builds} grain builds of {args.grain_seconds}s "
+        f"({args.separation_workers + args.synthesis_workers} worker processes)"
+    )
+    for mode in args.modes:
+        report(mode, run(mode, args))
+
+
+if __name__ == "__main__":
+    main()
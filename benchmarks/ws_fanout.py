@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: WebSocket fan-out latency with thousands of local clients.
+
+Simulated sockets (no network) subscribe to one channel; a fraction of
+them are slow consumers whose send takes --slow-ms. A stream of progress
+events is broadcast and each fast client records the delay between
+broadcast and delivery. The hub (ConnectionManager) is compared with the
+previous serial broadcast, which awaited every socket in turn.
+
+Slow clients receive events faster than they can send, so their
+queues fill and intermediate events are coalesced (reported as dropped).
+
+Usage:
+    python -m benchmarks.ws_fanout --clients 5000
+    python -m benchmarks.ws_fanout --clients 2000 --events 10 --serial
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from src.api.v1.websocket.manager import ConnectionManager
+
+CHANNEL = "mix:bench"
+
+
+class SimulatedSocket:
+    """Stands in for a Starlette WebSocket."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.latencies: list[float] = []
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_json(self, message: dict):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)  # A real send yields to the loop
+        self.latencies.append(time.perf_counter() - message["sent_at"])
+        self.received += 1
+
+
+class SerialManager:
+    """Previous ConnectionManager.broadcast: one socket at a time."""
+
+    def __init__(self):
+        self.connections: dict[str, set] = {}
+
+    async def connect(self, websocket, channel: str):
+        await websocket.accept()
+        self.connections.setdefault(channel, set()).add(websocket)
+
+    async def broadcast(self, channel: str, message: dict):
+        for websocket in self.connections.get(channel, set()).copy():
+            try:
+                await websocket.send_json(message)
+            except Exception:
+                self.connections[channel].discard(websocket)
+
+
+async def run(manager, clients: int, slow: float, slow_ms: float, events: int, interval: float):
+    rng = np.random.default_rng(0)
+    sockets = [
+        SimulatedSocket(slow_ms / 1000 if rng.random() < slow else 0.0)
+        for _ in range(clients)
+    ]
+    for socket in sockets:
+        await manager.connect(socket, CHANNEL)
+
+    start = time.perf_counter()
+    for i in range(events):
+        await manager.broadcast(CHANNEL, {
+            "type": "progress",
+            "percent": 100 * (i + 1) / events,
+            "sent_at": time.perf_counter()
+        })
+        await asyncio.sleep(interval)
+
+    # Let queued messages drain
+    fast = [s for s in sockets if not s.delay]
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline and any(s.received < events for s in fast):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([lat for s in fast for lat in s.latencies]) * 1000
+    slow_sockets = [s for s in sockets if s.delay]
+    stats = manager.stats() if isinstance(manager, ConnectionManager) else {}
+
+    for socket in sockets:
+        if isinstance(manager, ConnectionManager):
+            manager.disconnect(socket, CHANNEL)
+
+    return {
+        "elapsed": elapsed,
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": float(latencies.max()),
+        "fast_delivered": sum(s.received for s in fast) / max(len(fast) * events, 1),
+        "slow_clients": len(slow_sockets),
+        "dropped": stats.get("dropped", 0),
+        "channels_left": len(manager.connections),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--slow", type=float, default=0.01, help="Fraction of slow clients")
+    parser.add_argument("--slow-ms", type=float, default=250.0)
+    parser.add_argument("--events", type=int, default=40)
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between events")
+    parser.add_argument("--serial", action="store_true", help="Also run the (slow) serial baseline")
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients ({args.slow:.0%} slow, {args.slow_ms:.0f} ms/send), "
+        f"{args.events} events every {args.interval * 1000:.0f} ms"
+    )
+    managers = [("hub", ConnectionManager(queue_size=16, send_timeout=5.0))]
+    if args.serial:
+        managers.insert(0, ("serial", SerialManager()))
+
+    for name, manager in managers:
+        r = asyncio.run(run(manager, args.clients, args.slow, args.slow_ms, args.events, args.interval))
+        print(
+            f"  {name:<6} fast-client latency p50 {r['p50']:8.1f} ms  p99 {r['p99']:8.1f} ms  "
+            f"max {r['max']:8.1f} ms  delivered {r['fast_delivered']:.0%}  "
+            f"dropped {r['dropped']}  total {r['elapsed']:.1f} s"
+        )
+    print(f"  channels left after disconnect (hub): {r['channels_left']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# src/api/offload.py
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from celery import Task
+from celery.canvas import Signature
+from celery.result import AsyncResult
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for blocking I/O issued by API endpoints."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.API_IO_THREADS,
+            thread_name_prefix="api-io"
+        )
+    return _executor
+
+
+def close_executor():
+    """Wait for in-flight calls and drop the pool (shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+    _executor = None
+
+
+def pool_stats() -> dict:
+    """Threads started and calls waiting for one."""
+    if _executor is None:
+        return {
+            "threads": 0,
+            "queued": 0,
+            "max_threads": settings.API_IO_THREADS,
+        }
+    return {
+        "threads": len(_executor._threads),
+        "queued": _executor._work_queue.qsize(),
+        "max_threads": settings.API_IO_THREADS,
+    }
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking call on the I/O pool and await its result.
+
+    The synchronous clients (MinIO, Redis, the Celery broker) and hashing
+    of uploads would otherwise stall the event loop, and with it every
+    other request on the worker. At most API_IO_THREADS calls run at once;
+    the rest wait in the pool's queue without blocking the loop.
+
+    Returns:
+        Whatever func returns (its exceptions are re-raised here)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(),
+        functools.partial(func, *args, **kwargs),
+    )
+
+
+async def dispatch(task: Task | Signature, *args, **kwargs) -> AsyncResult:
+    """Async task.delay() (or workflow.delay()), publishing off the loop."""
+    return await run_blocking(task.delay, *args, **kwargs)
@@ -1,8 +1,9 @@
 # src/api/v1/library/router.py
 from fastapi import APIRouter, HTTPException
+from src.api.offload import run_blocking
 from src.db.repositories import StyleSoundRepository
-from src.storage.minio_client import MinIOClient
-from src.cache.redis_client import RedisCache
+from src.storage.minio_client import get_storage
+from src.tasks.artifacts import get_grain_store
 from src.api.v1.library.schemas import (
     StyleSoundResponse,
     LibraryListResponse,
@@ -38,19 +39,17 @@ async def get_sound(sound_id: str):
 async def delete_sound(sound_id: str):
     """Remove sound from library."""
     repo = StyleSoundRepository()
-    storage = MinIOClient()
-    cache = RedisCache()
+    storage = get_storage()
 
     sound = await repo.get_by_id(sound_id)
     if not sound:
         raise HTTPException(404, "Sound not found")
 
     # Remove file
-    storage.delete(sound.file_path)
+    await run_blocking(storage.delete, sound.file_path)
 
-    # Remove grain cache
-    if sound.grain_cache_key:
-        cache.delete(sound.grain_cache_key)
+    # Remove grain library from every cache tier (with its grain banks)
+    await run_blocking(get_grain_store().delete, sound_id)
 
     # Remove from database
     await repo.delete(sound_id)
@@ -1,10 +1,12 @@
 # src/api/v1/mix/router.py
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import RedirectResponse
+from src.api.offload import dispatch, run_blocking
 from src.db.repositories import MixRepository, ProjectRepository
 from src.tasks.synthesis import create_mix
-from src.storage.minio_client import MinIOClient
+from src.storage.minio_client import get_storage
 from src.api.v1.mix.schemas import (
+    MIX_PRESETS,
     CreateMixRequest,
     CreateMixResponse,
     MixStatusResponse
@@ -40,7 +42,7 @@ async def create_mix_endpoint(request: CreateMixRequest):
     })
 
     # Dispatch task
-    create_mix.delay(mix_id)
+    await dispatch(create_mix, mix_id)
 
     return CreateMixResponse(
         mix_id=mix_id,
@@ -49,6 +51,12 @@ async def create_mix_endpoint(request: CreateMixRequest):
     )
 
 
+@router.get("/presets")
+async def list_presets():
+    """Named MixSettings presets (``settings.preset`` in a mix request)."""
+    return MIX_PRESETS
+
+
 @router.get("/{mix_id}", response_model=MixStatusResponse)
 async def get_mix_status(mix_id: str):
     """Mix status."""
@@ -67,12 +75,43 @@ async def get_mix_status(mix_id: str):
     )
 
     if mix.status == "complete" and mix.output_path:
-        storage = MinIOClient()
-        response.download_url = storage.get_presigned_url(mix.output_path)
+        storage = get_storage()
+        response.download_url = await run_blocking(
+            storage.get_presigned_url,
+            mix.output_path,
+        )
 
     return response
 
 
+@router.post("/{mix_id}/retry", response_model=CreateMixResponse)
+async def retry_mix(mix_id: str):
+    """Run a failed mix again (keeps cached renders and an uploaded output)."""
+
+    repo = MixRepository()
+    mix = await repo.get_by_id(mix_id)
+
+    if not mix:
+        raise HTTPException(404, "Mix not found")
+
+    # A queued or processing mix is still running: a second run would
+    # write the same checkpoints and output
+    if mix.status != "error":
+        raise HTTPException(
+            409,
+            f"Mix is {mix.status}, only failed mixes can be retried",
+        )
+
+    await repo.update_status(mix_id, "queued")
+    await dispatch(create_mix, mix_id)
+
+    return CreateMixResponse(
+        mix_id=mix_id,
+        status="queued",
+        message="Mix retry started"
+    )
+
+
 @router.get("/{mix_id}/download")
 async def download_mix(mix_id: str):
     """Redirect to download URL."""
@@ -86,7 +125,11 @@ async def download_mix(mix_id: str):
     if mix.status != "complete":
         raise HTTPException(400, "Mix not yet complete")
 
-    storage = MinIOClient()
-    url = storage.get_presigned_url(mix.output_path, expires=3600)
+    storage = get_storage()
+    url = await run_blocking(
+        storage.get_presigned_url,
+        mix.output_path,
+        expires=3600,
+    )
 
     return RedirectResponse(url=url)
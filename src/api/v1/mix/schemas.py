@@ -1,6 +1,6 @@
 # src/api/v1/mix/schemas.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional
 
 
 class StemConfig(BaseModel):
@@ -21,10 +21,35 @@ class MixConfig(BaseModel):
     vocals: VocalsConfig = VocalsConfig()
 
 
+# Named MixSettings bundles (see benchmarks/mix_settings.py for the numbers)
+MIX_PRESETS = {
+    # No pYIN pass and random grain choice: renders without pitch analysis
+    # when none is cached, at the cost of grains not following the melody
+    "fast": {
+        "grain_duration_ms": 120,
+        "use_pitch_mapping": False,
+        "use_envelope": True,
+    },
+}
+
+
 class MixSettings(BaseModel):
-    grain_duration_ms: int = 120
+    preset: Optional[Literal["fast"]] = None
+    # Bounded: the grain bank (or the grains rendered without one) grows
+    # with the grain length
+    grain_duration_ms: int = Field(120, gt=0, le=1000)
     use_pitch_mapping: bool = True
     use_envelope: bool = True
+    # Grain selection seed; same settings + seed = same render
+    seed: int = Field(0, ge=0, lt=2**32)
+
+    @model_validator(mode="before")
+    @classmethod
+    def apply_preset(cls, data):
+        """Fill fields not given explicitly from the preset."""
+        if isinstance(data, dict) and data.get("preset") in MIX_PRESETS:
+            return {**MIX_PRESETS[data["preset"]], **data}
+        return data
 
 
 class CreateMixRequest(BaseModel):
@@ -1,12 +1,17 @@
 # src/api/v1/projects/router.py
 from fastapi import APIRouter, HTTPException
+import json
+from src.api.offload import dispatch, run_blocking
 from src.db.repositories import ProjectRepository
-from src.storage.minio_client import MinIOClient
+from src.storage.minio_client import get_storage
+from src.tasks.separation import chunks_prefix, stems_prefix
+from src.tasks.pipeline import PROJECT_PIPELINE, project_pipeline
 from src.api.v1.projects.schemas import (
     ProjectResponse,
     ProjectListResponse,
     ProjectStatusResponse,
     StemStatus,
+    RetryResponse,
     DeleteResponse
 )
 
@@ -46,7 +51,8 @@ async def get_project_status(project_id: str):
 
     response = ProjectStatusResponse(
         project_id=project_id,
-        status=project.status
+        status=project.status,
+        stages=project.stages
     )
 
     if project.status == "ready":
@@ -60,20 +66,93 @@ async def get_project_status(project_id: str):
     return response
 
 
+@router.get("/{project_id}/waveform")
+async def get_project_waveform(project_id: str):
+    """Waveform preview (min/max per bucket of the mix and each stem)."""
+    repo = ProjectRepository()
+    project = await repo.get_by_id(project_id)
+
+    if not project:
+        raise HTTPException(404, "Project not found")
+
+    if (project.stages or {}).get("preview", {}).get("status") != "complete":
+        raise HTTPException(404, "Waveform not available yet")
+
+    storage = get_storage()
+    data = await run_blocking(
+        storage.download_bytes,
+        project.stages["preview"]["path"],
+    )
+    return json.loads(data)
+
+
+@router.post("/{project_id}/retry", response_model=RetryResponse)
+async def retry_project(project_id: str):
+    """
+    Run the project's unfinished stages again.
+
+    Completed stages are skipped, and within a stage the checkpoints of
+    the previous attempt (published stems, separated chunks, analyzed
+    stems) are reused.
+    """
+    repo = ProjectRepository()
+    project = await repo.get_by_id(project_id)
+
+    if not project:
+        raise HTTPException(404, "Project not found")
+
+    # Stages after a failed one stay pending; without a failure the
+    # pipeline is still running (or done)
+    statuses = [
+        stage.get("status") for stage in (project.stages or {}).values()
+    ]
+    if "error" not in statuses:
+        raise HTTPException(409, "Only a failed pipeline can be retried")
+
+    stages = [
+        stage for stage in PROJECT_PIPELINE
+        if stage in (project.stages or {})
+        and project.stages[stage].get("status") != "complete"
+    ]
+    for stage in stages:
+        await repo.update_stage(project_id, stage, "pending")
+    await dispatch(project_pipeline(project_id, stages))
+
+    return RetryResponse(
+        project_id=project_id,
+        stages=stages,
+        message="Retry started"
+    )
+
+
 @router.delete("/{project_id}", response_model=DeleteResponse)
 async def delete_project(project_id: str):
     """Remove project and associated files."""
     repo = ProjectRepository()
-    storage = MinIOClient()
+    storage = get_storage()
 
     project = await repo.get_by_id(project_id)
     if not project:
         raise HTTPException(404, "Project not found")
 
     # Remove files
-    storage.delete_prefix(f"uploads/base/{project_id}/")
-    storage.delete_prefix(f"stems/{project_id}/")
-    storage.delete_prefix(f"mixes/{project_id}/")
+    await run_blocking(storage.delete_prefix, f"uploads/base/{project_id}/")
+    await run_blocking(storage.delete_prefix, f"stems/{project_id}/")
+    await run_blocking(storage.delete_prefix, f"mixes/{project_id}/")
+    await run_blocking(storage.delete_prefix, chunks_prefix(project_id))
+
+    # Content-addressed stems are shared by identical uploads
+    if project.base_file_hash and project.demucs_model:
+        shared = await repo.get_by_separation_key(
+            project.base_file_hash,
+            project.demucs_model,
+            exclude_id=project_id
+        )
+        if not shared:
+            await run_blocking(
+                storage.delete_prefix,
+                stems_prefix(project.base_file_hash, project.demucs_model),
+            )
 
     # Remove from database
     await repo.delete(project_id)
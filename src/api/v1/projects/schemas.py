@@ -10,6 +10,7 @@ class ProjectResponse(BaseModel):
     status: str
     base_file_path: Optional[str]
     base_file_hash: Optional[str]
+    demucs_model: Optional[str] = None
     duration_seconds: Optional[float]
     sample_rate: Optional[int]
     vocals_path: Optional[str]
@@ -17,6 +18,7 @@ class ProjectResponse(BaseModel):
     bass_path: Optional[str]
     other_path: Optional[str]
     analysis_cache_key: Optional[str]
+    stages: Optional[dict] = None
     created_at: Optional[str]
     updated_at: Optional[str]
 
@@ -36,6 +38,13 @@ class ProjectStatusResponse(BaseModel):
     project_id: str
     status: str
     stems: Optional[StemStatus] = None
+    stages: Optional[dict] = None
+
+
+class RetryResponse(BaseModel):
+    project_id: str
+    stages: list[str]
+    message: str
 
 
 class DeleteResponse(BaseModel):
@@ -0,0 +1,70 @@
+# src/api/v1/upload/limits.py
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Room for multipart boundaries, part headers and small form fields
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimit:
+    """
+    ASGI middleware that caps request bodies of the upload endpoints.
+
+    Runs before Starlette parses the multipart form, so an oversized
+    upload is refused before it is spooled to disk: a ``Content-Length``
+    over the limit gets a 413 without reading the body, and a chunked
+    body is cut off with a 413 as soon as it passes the limit.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[str, int]):
+        """
+        Args:
+            app: Wrapped ASGI application
+            limits: Request path -> largest accepted body in bytes
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        max_bytes = None
+        if scope["type"] == "http":
+            max_bytes = self.limits.get(scope["path"])
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload too large (max {max_bytes // (1024 * 1024)}MB)"
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                # Raised inside form parsing: FastAPI passes it through
+                raise HTTPException(413, detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def upload_limits(
+    prefix: str,
+    max_file_mb: int,
+    max_style_files: int
+) -> dict[str, int]:
+    """Body limits of the upload routes mounted under ``prefix``."""
+    max_file_bytes = max_file_mb * 1024 * 1024
+    return {
+        f"{prefix}/upload/base-track": max_file_bytes + FORM_OVERHEAD_BYTES,
+        f"{prefix}/upload/style-sound": (
+            max_style_files * max_file_bytes + FORM_OVERHEAD_BYTES
+        ),
+    }
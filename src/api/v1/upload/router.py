@@ -1,16 +1,73 @@
 # src/api/v1/upload/router.py
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from src.storage.minio_client import MinIOClient
+from src.api.offload import dispatch, run_blocking
+from src.storage.minio_client import MinIOClient, get_storage
+from src.storage.streaming import HashingReader, UploadTooLarge
 from src.db.repositories import ProjectRepository, StyleSoundRepository
-from src.tasks.separation import separate_stems
 from src.tasks.analysis import build_grain_library
+from src.tasks.pipeline import pending_stages, project_pipeline, project_stages
 from src.api.v1.upload.schemas import UploadBaseTrackResponse, UploadStyleSoundsResponse, UploadedSound
-import hashlib
+from src.config.settings import get_settings
 import uuid
 
+settings = get_settings()
+
 router = APIRouter(prefix="/upload", tags=["upload"])
 
 
+def _stream_upload(
+    storage: MinIOClient,
+    file: UploadFile,
+    storage_path: str
+) -> str:
+    """
+    Stream an uploaded file to storage in chunks, hashing it on the way.
+
+    Blocking (reads the spooled file, hashes, uploads): call it through
+    run_blocking.
+
+    Returns:
+        SHA-256 hex digest of the file
+    """
+    reader = HashingReader(
+        file.file,
+        max_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    )
+    try:
+        storage.upload_stream(reader, storage_path)
+    except UploadTooLarge:
+        raise HTTPException(
+            413,
+            f"File too large (max {settings.MAX_UPLOAD_SIZE_MB}MB)"
+        )
+    return reader.hexdigest()
+
+
+def _hash_upload(file: UploadFile) -> str:
+    """
+    Hash an uploaded file without storing it, then rewind it.
+
+    Blocking (reads the spooled file): call it through run_blocking.
+
+    Returns:
+        SHA-256 hex digest of the file
+    """
+    reader = HashingReader(
+        file.file,
+        max_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    )
+    try:
+        while reader.read():
+            pass
+    except UploadTooLarge:
+        raise HTTPException(
+            413,
+            f"File too large (max {settings.MAX_UPLOAD_SIZE_MB}MB)"
+        )
+    file.file.seek(0)
+    return reader.hexdigest()
+
+
 @router.post("/base-track", response_model=UploadBaseTrackResponse)
 async def upload_base_track(
     file: UploadFile = File(...),
@@ -22,35 +79,71 @@ async def upload_base_track(
     if not file.filename.lower().endswith(('.wav', '.mp3', '.flac', '.ogg')):
         raise HTTPException(400, "Unsupported format")
 
-    content = await file.read()
-
-    # Check size (100MB max)
-    if len(content) > 100 * 1024 * 1024:
-        raise HTTPException(413, "File too large (max 100MB)")
-
-    # Hash for deduplication
-    file_hash = hashlib.sha256(content).hexdigest()
-
     # Generate IDs
     project_id = str(uuid.uuid4())
     storage_path = f"uploads/base/{project_id}/{file.filename}"
 
-    # Upload to MinIO
-    storage = MinIOClient()
-    storage.upload_bytes(content, storage_path)
+    # Stream to MinIO, hashing for deduplication and enforcing the size limit
+    storage = get_storage()
+    file_hash = await run_blocking(_stream_upload, storage, file, storage_path)
 
-    # Create project in database
     repo = ProjectRepository()
+    model = settings.DEMUCS_MODEL
+
+    # Same content already separated with this model: reuse its stems
+    source = await repo.get_by_separation_key(
+        file_hash,
+        model,
+        statuses=["ready"]
+    )
+    if source:
+        stages = project_stages(skip=("separate",))
+        await repo.create({
+            "id": project_id,
+            "name": project_name or file.filename,
+            "base_file_path": storage_path,
+            "base_file_hash": file_hash,
+            "demucs_model": model,
+            "vocals_path": source.vocals_path,
+            "drums_path": source.drums_path,
+            "bass_path": source.bass_path,
+            "other_path": source.other_path,
+            "status": "ready",
+            "stages": {
+                "separate": {
+                    "status": "complete",
+                    "reused_from": str(source.id)
+                },
+                **pending_stages(stages)
+            }
+        })
+
+        # Analysis and preview are shared by content too: these stages
+        # only fill in what the source project has not finished yet
+        await dispatch(project_pipeline(project_id, stages))
+
+        return UploadBaseTrackResponse(
+            project_id=project_id,
+            status="ready",
+            message="Stems reused from identical upload"
+        )
+
+    # Create project in database
+    stages = project_stages()
     project = await repo.create({
         "id": project_id,
         "name": project_name or file.filename,
         "base_file_path": storage_path,
         "base_file_hash": file_hash,
-        "status": "created"
+        "demucs_model": model,
+        "status": "created",
+        "stages": pending_stages(stages)
     })
 
-    # Dispatch separation task
-    separate_stems.delay(project_id)
+    # Dispatch the pipeline: separation (waits on an in-flight separation
+    # of the same content instead of running Demucs again), then analysis
+    # and preview
+    await dispatch(project_pipeline(project_id, stages))
 
     return UploadBaseTrackResponse(
         project_id=project_id,
@@ -65,14 +158,23 @@ async def upload_style_sound(
 ):
     """Upload style sounds for library."""
 
-    storage = MinIOClient()
+    if len(files) > settings.MAX_STYLE_UPLOAD_FILES:
+        raise HTTPException(
+            400,
+            f"Too many files (max {settings.MAX_STYLE_UPLOAD_FILES})"
+        )
+
+    storage = get_storage()
     repo = StyleSoundRepository()
 
     uploaded = []
 
     for file in files:
-        content = await file.read()
-        file_hash = hashlib.sha256(content).hexdigest()
+        style_id = str(uuid.uuid4())
+        storage_path = f"uploads/styles/{style_id}/{file.filename}"
+
+        # Hash the spooled file first: duplicates are never uploaded
+        file_hash = await run_blocking(_hash_upload, file)
 
         # Check duplicate
         existing = await repo.get_by_hash(file_hash)
@@ -84,10 +186,7 @@ async def upload_style_sound(
             ))
             continue
 
-        style_id = str(uuid.uuid4())
-        storage_path = f"uploads/styles/{style_id}/{file.filename}"
-
-        storage.upload_bytes(content, storage_path)
+        await run_blocking(storage.upload_stream, file.file, storage_path)
 
         style = await repo.create({
             "id": style_id,
@@ -97,7 +196,7 @@ async def upload_style_sound(
         })
 
         # Dispatch grain library building
-        build_grain_library.delay(style_id)
+        await dispatch(build_grain_library, style_id)
 
         uploaded.append(UploadedSound(
             id=style_id,
@@ -1,35 +1,123 @@
 # src/api/v1/websocket/manager.py
 from fastapi import WebSocket
-from typing import Dict, Set
+from typing import Dict
 import asyncio
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+
+class Connection:
+    """One client socket with its outgoing queue and sender task."""
+
+    def __init__(self, websocket: WebSocket, channel: str, queue_size: int):
+        self.websocket = websocket
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.task: asyncio.Task | None = None
+
+    def offer(self, message: dict) -> bool:
+        """
+        Queue a message without waiting.
+
+        Progress events are state snapshots, so when the queue is full the
+        oldest pending message is dropped: a slow client skips intermediate
+        states but always receives the latest one (including the final event).
+
+        Returns:
+            False if a message had to be dropped
+        """
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.queue.get_nowait()
+            self.queue.put_nowait(message)
+            self.dropped += 1
+            return False
 
 
 class ConnectionManager:
-    """WebSocket connection manager."""
+    """
+    WebSocket connection hub.
 
-    def __init__(self):
-        self.connections: Dict[str, Set[WebSocket]] = {}
+    Each connection has a bounded queue drained by its own sender task,
+    so broadcast() never waits on a socket and one slow client cannot
+    delay the others. A client whose send stalls past send_timeout is
+    disconnected; channels are removed when their last client leaves.
+    Cross-process delivery comes from the Redis subscription in
+    ProgressRelay, which feeds every API process's hub.
+    """
+
+    def __init__(self, queue_size: int = None, send_timeout: float = None):
+        self.connections: Dict[str, Dict[WebSocket, Connection]] = {}
+        self.queue_size = queue_size or settings.WS_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT
+        self.dropped = 0
 
     async def connect(self, websocket: WebSocket, channel: str):
         await websocket.accept()
-        if channel not in self.connections:
-            self.connections[channel] = set()
-        self.connections[channel].add(websocket)
+        connection = Connection(websocket, channel, self.queue_size)
+        connection.task = asyncio.create_task(self._sender(connection))
+        self.connections.setdefault(channel, {})[websocket] = connection
 
     def disconnect(self, websocket: WebSocket, channel: str):
-        if channel in self.connections:
-            self.connections[channel].discard(websocket)
+        channel_connections = self.connections.get(channel)
+        if channel_connections is None:
+            return
+
+        connection = channel_connections.pop(websocket, None)
+        if connection is not None:
+            self.dropped += connection.dropped
+            if connection.task is not asyncio.current_task():
+                connection.task.cancel()
+
+        if not channel_connections:
+            del self.connections[channel]
+
+    def send(self, websocket: WebSocket, channel: str, message: dict):
+        """Queue a message for one client of a channel."""
+        connection = self.connections.get(channel, {}).get(websocket)
+        if connection is not None:
+            connection.offer(message)
 
     async def broadcast(self, channel: str, message: dict):
-        """Send message to all clients in a channel."""
-        if channel not in self.connections:
-            return
+        """Queue a message for all clients in a channel."""
+        for connection in self.connections.get(channel, {}).values():
+            connection.offer(message)
 
-        for websocket in self.connections[channel].copy():
+    async def _sender(self, connection: Connection):
+        """Drain a connection's queue; drop the client on error or stall."""
+        try:
+            while True:
+                message = await connection.queue.get()
+                await asyncio.wait_for(
+                    connection.websocket.send_json(message),
+                    self.send_timeout
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(connection.websocket, connection.channel)
             try:
-                await websocket.send_json(message)
+                await connection.websocket.close()
             except Exception:
-                self.connections[channel].discard(websocket)
+                pass
+
+    def stats(self) -> dict:
+        """Connection counts and messages dropped for slow clients."""
+        connections = [
+            connection
+            for channel_connections in self.connections.values()
+            for connection in channel_connections.values()
+        ]
+        return {
+            "channels": len(self.connections),
+            "connections": len(connections),
+            "queued": sum(c.queue.qsize() for c in connections),
+            "dropped": self.dropped + sum(c.dropped for c in connections),
+        }
 
 
 # Global instance
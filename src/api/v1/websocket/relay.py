@@ -0,0 +1,79 @@
+# src/api/v1/websocket/relay.py
+import asyncio
+import json
+import logging
+from typing import Optional
+import redis.asyncio as aioredis
+from src.api.v1.websocket.manager import ConnectionManager
+from src.config.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Channels the Celery tasks publish progress events on
+PROGRESS_PATTERNS = ["project:*", "mix:*", "style:*"]
+
+# Seconds to wait before resubscribing after a Redis error
+RECONNECT_DELAY = 1.0
+
+
+class ProgressRelay:
+    """
+    Fans task progress events from Redis pub/sub out to WebSocket clients.
+
+    One pattern subscription per API process (not per client); each
+    message is queued on the ConnectionManager channel of the same name,
+    so with several uvicorn workers every process delivers to its own
+    clients and tasks never need to know where a socket lives.
+    """
+
+    def __init__(self, manager: ConnectionManager, patterns: list[str] = None):
+        self.manager = manager
+        self.patterns = patterns or PROGRESS_PATTERNS
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start relaying in the background (call from the running loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop relaying and close the subscription."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self._relay()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Progress relay failed, resubscribing")
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _relay(self):
+        client = aioredis.from_url(settings.REDIS_URL)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.psubscribe(*self.patterns)
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                channel = message["channel"].decode()
+                # Skip decoding for channels nobody is watching
+                if not self.manager.connections.get(channel):
+                    continue
+                await self.manager.broadcast(
+                    channel,
+                    json.loads(message["data"])
+                )
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
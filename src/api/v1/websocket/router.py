@@ -1,31 +1,47 @@
 # src/api/v1/websocket/router.py
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from src.api.v1.websocket.manager import ConnectionManager
+from src.api.offload import run_blocking
+from src.api.v1.websocket.manager import ws_manager
+from src.cache.redis_client import get_cache
+from src.tasks.progress import progress_key
 
 router = APIRouter()
-manager = ConnectionManager()
 
 
-@router.websocket("/ws/project/{project_id}")
-async def project_websocket(websocket: WebSocket, project_id: str):
-    """WebSocket to track project status."""
-    await manager.connect(websocket, f"project:{project_id}")
+async def _track(websocket: WebSocket, channel: str):
+    """Stream a channel's progress events until the client disconnects."""
+    await ws_manager.connect(websocket, channel)
 
     try:
+        # Current state, for clients connecting mid-job
+        last = await run_blocking(get_cache().get_json, progress_key(channel))
+        if last:
+            ws_manager.send(websocket, channel, last)
+
         while True:
             # Keep connection open
             await websocket.receive_text()
-    except WebSocketDisconnect:
-        manager.disconnect(websocket, f"project:{project_id}")
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the sender closed the socket after a stalled send
+        # while this receive was pending
+        pass
+    finally:
+        ws_manager.disconnect(websocket, channel)
+
+
+@router.websocket("/ws/project/{project_id}")
+async def project_websocket(websocket: WebSocket, project_id: str):
+    """WebSocket to track project status (separation and analysis)."""
+    await _track(websocket, f"project:{project_id}")
 
 
 @router.websocket("/ws/mix/{mix_id}")
 async def mix_websocket(websocket: WebSocket, mix_id: str):
     """WebSocket to track mix status."""
-    await manager.connect(websocket, f"mix:{mix_id}")
+    await _track(websocket, f"mix:{mix_id}")
 
-    try:
-        while True:
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        manager.disconnect(websocket, f"mix:{mix_id}")
+
+@router.websocket("/ws/style/{style_id}")
+async def style_websocket(websocket: WebSocket, style_id: str):
+    """WebSocket to track grain library builds of a style sound."""
+    await _track(websocket, f"style:{style_id}")
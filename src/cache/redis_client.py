@@ -1,17 +1,74 @@
 # src/cache/redis_client.py
 import redis
-import pickle
 import json
+import numpy as np
+from io import BytesIO
 from src.config.settings import get_settings
 
 settings = get_settings()
 
+_pool: redis.ConnectionPool | None = None
+_cache: "RedisCache | None" = None
+
+
+def get_redis_pool() -> redis.ConnectionPool:
+    """Process-wide Redis connection pool."""
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_POOL_SIZE
+        )
+    return _pool
+
+
+def get_cache() -> "RedisCache":
+    """Process-wide RedisCache on the shared pool."""
+    global _cache
+    if _cache is None:
+        _cache = RedisCache()
+    return _cache
+
+
+def close_cache():
+    """Disconnect the shared pool (shutdown, or after fork)."""
+    global _pool, _cache
+    if _pool is not None:
+        _pool.disconnect()
+    _pool = None
+    _cache = None
+
+
+def pool_stats() -> dict:
+    """
+    Connection pool usage of the shared pool.
+
+    redis-py has no public API for these counters, so they come from the
+    pool's private attributes and read as None if an upgrade renames
+    them (pinned by tests/test_pool_stats.py).
+    """
+    if _pool is None:
+        return {
+            "created": 0,
+            "in_use": 0,
+            "available": 0,
+            "max": settings.REDIS_POOL_SIZE,
+        }
+    in_use = getattr(_pool, "_in_use_connections", None)
+    available = getattr(_pool, "_available_connections", None)
+    return {
+        "created": getattr(_pool, "_created_connections", None),
+        "in_use": len(in_use) if in_use is not None else None,
+        "available": len(available) if available is not None else None,
+        "max": _pool.max_connections,
+    }
+
 
 class RedisCache:
     """Redis client for caching."""
 
-    def __init__(self):
-        self.client = redis.from_url(settings.REDIS_URL)
+    def __init__(self, pool: redis.ConnectionPool | None = None):
+        self.client = redis.Redis(connection_pool=pool or get_redis_pool())
 
     def set_json(self, key: str, value: dict, ttl: int = 86400):
         """Store JSON."""
@@ -24,21 +81,73 @@ class RedisCache:
             return json.loads(data)
         return None
 
-    def set_grains(self, key: str, grains: list, ttl: int = 86400):
-        """Store grain library (pickle)."""
-        self.client.setex(key, ttl, pickle.dumps(grains))
+    def merge_json(self, key: str, updates: dict, ttl: int = 86400):
+        """Merge top-level fields into a stored JSON object atomically."""
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    value = json.loads(data) if data else {}
+                    value.update(updates)
+                    pipe.multi()
+                    pipe.setex(key, ttl, json.dumps(value))
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    continue
+
+    def set_bytes(self, key: str, data: bytes, ttl: int = 86400):
+        """Store an encoded value as is."""
+        self.client.setex(key, ttl, data)
+
+    def get_bytes(self, key: str) -> bytes | None:
+        """Retrieve an encoded value (None if missing)."""
+        return self.client.get(key)
 
-    def get_grains(self, key: str) -> list | None:
-        """Retrieve grain library."""
+    def set_array(self, key: str, array: np.ndarray, ttl: int = 86400):
+        """Store numpy array (.npy format)."""
+        buffer = BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        self.client.setex(key, ttl, buffer.getvalue())
+
+    def get_array(self, key: str) -> np.ndarray | None:
+        """Retrieve numpy array."""
         data = self.client.get(key)
         if data:
-            return pickle.loads(data)
+            return np.load(BytesIO(data), allow_pickle=False)
         return None
 
+    def lock(
+        self,
+        name: str,
+        timeout: int,
+        blocking_timeout: int | None = None
+    ):
+        """Distributed lock (use as context manager)."""
+        return self.client.lock(
+            name,
+            timeout=timeout,
+            blocking_timeout=blocking_timeout
+        )
+
+    def incr(self, key: str, amount: int = 1, ttl: int = 86400) -> int:
+        """Increment a counter, refreshing its TTL."""
+        with self.client.pipeline() as pipe:
+            pipe.incr(key, amount)
+            pipe.expire(key, ttl)
+            value, _ = pipe.execute()
+        return value
+
     def delete(self, key: str):
         """Delete key."""
         self.client.delete(key)
 
+    def delete_prefix(self, prefix: str):
+        """Delete all keys with given prefix."""
+        for key in self.client.scan_iter(match=f"{prefix}*"):
+            self.client.delete(key)
+
     def publish(self, channel: str, message: dict):
         """Publish message to channel."""
         self.client.publish(channel, json.dumps(message))
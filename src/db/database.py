@@ -9,7 +9,11 @@ settings = get_settings()
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True
 )
 
 # Create session factory
@@ -23,6 +27,17 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+def pool_stats() -> dict:
+    """Connection pool usage of the engine."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+
 async def get_db():
     """Dependency for FastAPI endpoints."""
     async with AsyncSessionLocal() as session:
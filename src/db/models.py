@@ -18,6 +18,7 @@ class Project(Base):
     # Base file
     base_file_path = Column(String(500))
     base_file_hash = Column(String(64))
+    demucs_model = Column(String(100))  # Separation is keyed by hash + model
     duration_seconds = Column(Float)
     sample_rate = Column(Integer, default=44100)
 
@@ -30,6 +31,12 @@ class Project(Base):
     # Cached analysis
     analysis_cache_key = Column(String(100))
 
+    # Pipeline stages: {separate: {status, updated_at, ...}, analyze: ...}
+    stages = Column(JSON)
+
+    # Durable results of finished steps: {name: {path, etag, ...}}
+    checkpoints = Column(JSON)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -43,6 +50,7 @@ class Project(Base):
             "status": self.status,
             "base_file_path": self.base_file_path,
             "base_file_hash": self.base_file_hash,
+            "demucs_model": self.demucs_model,
             "duration_seconds": self.duration_seconds,
             "sample_rate": self.sample_rate,
             "vocals_path": self.vocals_path,
@@ -50,6 +58,8 @@ class Project(Base):
             "bass_path": self.bass_path,
             "other_path": self.other_path,
             "analysis_cache_key": self.analysis_cache_key,
+            "stages": self.stages,
+            "checkpoints": self.checkpoints,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
@@ -97,6 +107,9 @@ class Mix(Base):
     # Result
     output_path = Column(String(500))
 
+    # Durable results of finished steps: {name: {path, etag, ...}}
+    checkpoints = Column(JSON)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True))
 
@@ -111,6 +124,7 @@ class Mix(Base):
             "config": self.config,
             "settings": self.settings,
             "output_path": self.output_path,
+            "checkpoints": self.checkpoints,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
         }
@@ -1,12 +1,47 @@
 # src/db/repositories.py
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.database import AsyncSessionLocal
 from src.db.models import Project, StyleSound, Mix
+from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 import uuid
 
 
+async def _merge_json(
+    session_factory,
+    model,
+    row_id: str,
+    column: str,
+    updates: Dict[str, Any]
+):
+    """
+    Merge keys into a JSON column (None removes a key).
+
+    The row is locked while the JSON is rewritten, so tasks updating it
+    concurrently don't overwrite each other's keys.
+    """
+    async with session_factory() as session:
+        result = await session.execute(
+            select(model)
+            .where(model.id == uuid.UUID(row_id))
+            .with_for_update()
+        )
+        row = result.scalar_one_or_none()
+        if row is None:
+            return None
+
+        merged = dict(getattr(row, column) or {})
+        for key, value in updates.items():
+            if value is None:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+        setattr(row, column, merged)
+        await session.commit()
+        return row
+
+
 class ProjectRepository:
     """Repository for Project CRUD operations."""
 
@@ -30,6 +65,31 @@ class ProjectRepository:
             )
             return result.scalar_one_or_none()
 
+    async def get_by_separation_key(
+        self,
+        file_hash: str,
+        model: str,
+        exclude_id: Optional[str] = None,
+        statuses: Optional[List[str]] = None
+    ) -> Optional[Project]:
+        """Get a project with the same base content and model (ready first)."""
+        query = select(Project).where(
+            Project.base_file_hash == file_hash,
+            Project.demucs_model == model
+        )
+        if exclude_id:
+            query = query.where(Project.id != uuid.UUID(exclude_id))
+        if statuses:
+            query = query.where(Project.status.in_(statuses))
+        query = query.order_by(
+            (Project.status == "ready").desc(),
+            Project.created_at
+        ).limit(1)
+
+        async with self.session_factory() as session:
+            result = await session.execute(query)
+            return result.scalar_one_or_none()
+
     async def get_all(self) -> List[Project]:
         """Get all projects."""
         async with self.session_factory() as session:
@@ -37,17 +97,16 @@ class ProjectRepository:
             return result.scalars().all()
 
     async def update(self, project_id: str, data: Dict[str, Any]) -> Optional[Project]:
-        """Update project."""
+        """Update project (single UPDATE ... RETURNING round trip)."""
         async with self.session_factory() as session:
             result = await session.execute(
-                select(Project).where(Project.id == uuid.UUID(project_id))
+                update(Project)
+                .where(Project.id == uuid.UUID(project_id))
+                .values(**data)
+                .returning(Project)
             )
             project = result.scalar_one_or_none()
-            if project:
-                for key, value in data.items():
-                    setattr(project, key, value)
-                await session.commit()
-                await session.refresh(project)
+            await session.commit()
             return project
 
     async def update_status(self, project_id: str, status: str) -> Optional[Project]:
@@ -64,6 +123,42 @@ class ProjectRepository:
         }
         return await self.update(project_id, data)
 
+    async def update_stage(
+        self,
+        project_id: str,
+        stage: str,
+        status: str,
+        **detail
+    ) -> Optional[Project]:
+        """Record the status of one pipeline stage in ``Project.stages``."""
+        return await _merge_json(
+            self.session_factory,
+            Project,
+            project_id,
+            "stages",
+            {
+                stage: {
+                    "status": status,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                    **detail
+                }
+            }
+        )
+
+    async def set_checkpoints(
+        self,
+        project_id: str,
+        checkpoints: Dict[str, Any]
+    ) -> Optional[Project]:
+        """Add (or, with None, drop) entries of ``Project.checkpoints``."""
+        return await _merge_json(
+            self.session_factory,
+            Project,
+            project_id,
+            "checkpoints",
+            checkpoints
+        )
+
     async def delete(self, project_id: str):
         """Delete project."""
         async with self.session_factory() as session:
@@ -114,17 +209,16 @@ class StyleSoundRepository:
             return result.scalars().all()
 
     async def update(self, sound_id: str, data: Dict[str, Any]) -> Optional[StyleSound]:
-        """Update style sound."""
+        """Update style sound (single UPDATE ... RETURNING round trip)."""
         async with self.session_factory() as session:
             result = await session.execute(
-                select(StyleSound).where(StyleSound.id == uuid.UUID(sound_id))
+                update(StyleSound)
+                .where(StyleSound.id == uuid.UUID(sound_id))
+                .values(**data)
+                .returning(StyleSound)
             )
             sound = result.scalar_one_or_none()
-            if sound:
-                for key, value in data.items():
-                    setattr(sound, key, value)
-                await session.commit()
-                await session.refresh(sound)
+            await session.commit()
             return sound
 
     async def delete(self, sound_id: str):
@@ -163,23 +257,36 @@ class MixRepository:
             return result.scalar_one_or_none()
 
     async def update(self, mix_id: str, data: Dict[str, Any]) -> Optional[Mix]:
-        """Update mix."""
+        """Update mix (single UPDATE ... RETURNING round trip)."""
         async with self.session_factory() as session:
             result = await session.execute(
-                select(Mix).where(Mix.id == uuid.UUID(mix_id))
+                update(Mix)
+                .where(Mix.id == uuid.UUID(mix_id))
+                .values(**data)
+                .returning(Mix)
             )
             mix = result.scalar_one_or_none()
-            if mix:
-                for key, value in data.items():
-                    setattr(mix, key, value)
-                await session.commit()
-                await session.refresh(mix)
+            await session.commit()
             return mix
 
     async def update_status(self, mix_id: str, status: str) -> Optional[Mix]:
         """Update mix status."""
         return await self.update(mix_id, {"status": status})
 
+    async def set_checkpoints(
+        self,
+        mix_id: str,
+        checkpoints: Dict[str, Any]
+    ) -> Optional[Mix]:
+        """Add (or, with None, drop) entries of ``Mix.checkpoints``."""
+        return await _merge_json(
+            self.session_factory,
+            Mix,
+            mix_id,
+            "checkpoints",
+            checkpoints
+        )
+
     async def delete(self, mix_id: str):
         """Delete mix."""
         async with self.session_factory() as session:
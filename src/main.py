@@ -1,17 +1,44 @@
 # src/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.api import offload
 from src.api.v1.router import api_router
+from src.api.v1.upload.limits import UploadSizeLimit, upload_limits
+from src.api.v1.websocket.manager import ws_manager
+from src.api.v1.websocket.relay import ProgressRelay
 from src.api.v1.websocket.router import router as ws_router
+from src.cache import redis_client
 from src.config.settings import get_settings
+from src.db import database
+from src.storage import minio_client
+from src.tasks.artifacts import get_grain_store
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared clients once per process and release them on shutdown."""
+    minio_client.get_storage()
+    redis_client.get_cache()
+    # Task progress events -> WebSocket clients
+    relay = ProgressRelay(ws_manager)
+    relay.start()
+    yield
+    await relay.stop()
+    offload.close_executor()
+    redis_client.close_cache()
+    minio_client.close_storage()
+    await database.engine.dispose()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version="1.0.0",
-    description="Backend for audio mixing with granular synthesis"
+    description="Backend for audio mixing with granular synthesis",
+    lifespan=lifespan
 )
 
 # CORS
@@ -23,6 +50,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Refuse oversized uploads before the multipart body is spooled
+app.add_middleware(
+    UploadSizeLimit,
+    limits=upload_limits(
+        "/api/v1",
+        settings.MAX_UPLOAD_SIZE_MB,
+        settings.MAX_STYLE_UPLOAD_FILES
+    )
+)
+
 # Routers
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(ws_router)
@@ -34,6 +71,23 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics/pools")
+async def pool_metrics():
+    """Connection pool usage of the shared clients."""
+    return {
+        "database": database.pool_stats(),
+        "redis": redis_client.pool_stats(),
+        "minio": minio_client.pool_stats(),
+        "io_threads": offload.pool_stats(),
+    }
+
+
+@app.get("/metrics/caches")
+async def cache_metrics():
+    """Grain library cache hit/miss/build counters (all processes)."""
+    return {"grains": await offload.run_blocking(get_grain_store().stats)}
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
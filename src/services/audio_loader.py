@@ -2,26 +2,46 @@
 import librosa
 import soundfile as sf
 import numpy as np
+from io import BytesIO
 from typing import Tuple
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+
+def processing_dtype(dtype=None) -> np.dtype:
+    """Dtype used for audio buffers (AUDIO_DTYPE unless overridden)."""
+    return np.dtype(dtype or settings.AUDIO_DTYPE)
 
 
 class AudioLoader:
     """Service for loading and saving audio files."""
 
     @staticmethod
-    def load(file_path: str, sample_rate: int = 44100) -> Tuple[np.ndarray, int]:
+    def load(
+        file_path: str,
+        sample_rate: int = 44100,
+        dtype=None
+    ) -> Tuple[np.ndarray, int]:
         """
         Load audio file.
 
         Args:
             file_path: Path to audio file
             sample_rate: Target sample rate
+            dtype: Output dtype (default: AUDIO_DTYPE)
 
         Returns:
             Tuple of (audio array, sample rate)
         """
-        audio, sr = librosa.load(file_path, sr=sample_rate, mono=True)
-        return audio, sr
+        dtype = processing_dtype(dtype)
+        audio, sr = librosa.load(
+            file_path,
+            sr=sample_rate,
+            mono=True,
+            dtype=dtype
+        )
+        return audio.astype(dtype, copy=False), sr
 
     @staticmethod
     def save(audio: np.ndarray, file_path: str, sample_rate: int = 44100):
@@ -35,6 +55,22 @@ class AudioLoader:
         """
         sf.write(file_path, audio, sample_rate)
 
+    @staticmethod
+    def to_wav_bytes(audio: np.ndarray, sample_rate: int = 44100) -> bytes:
+        """
+        Encode audio as WAV in memory.
+
+        Args:
+            audio: Audio array, (samples,) or (samples, channels)
+            sample_rate: Sample rate
+
+        Returns:
+            WAV file contents
+        """
+        buffer = BytesIO()
+        sf.write(buffer, audio, sample_rate, format="WAV")
+        return buffer.getvalue()
+
     @staticmethod
     def get_duration(audio: np.ndarray, sample_rate: int) -> float:
         """
@@ -1,8 +1,11 @@
 # src/services/grain_builder.py
 import numpy as np
 import librosa
+import struct
 from dataclasses import dataclass
-from typing import List
+from functools import cached_property
+from typing import Iterator, List
+from src.services.grain_index import GrainIndex
 from src.services.pitch_analyzer import PitchAnalyzer
 
 
@@ -13,6 +16,143 @@ class Grain:
     rms: float
 
 
+class GrainLibrary:
+    """
+    Columnar grain library.
+
+    All grains share one contiguous float32 sample buffer; per-grain
+    offset, length, pitch and rms live in parallel arrays. Indexing
+    returns a Grain whose audio is a view into the buffer.
+
+    Binary layout (little endian, version 1):
+        header   magic "GRNL", u16 version, u16 reserved,
+                 u32 n_grains, u64 n_samples, 12 reserved bytes
+        offsets  int64[n_grains]
+        pitches  float64[n_grains]
+        lengths  int32[n_grains]
+        rms      float32[n_grains]
+        samples  float32[n_samples]
+    """
+
+    MAGIC = b"GRNL"
+    VERSION = 1
+    _HEADER = struct.Struct("<4sHHIQ12x")
+
+    def __init__(
+        self,
+        samples: np.ndarray,
+        offsets: np.ndarray,
+        lengths: np.ndarray,
+        pitches: np.ndarray,
+        rms: np.ndarray
+    ):
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.lengths = np.asarray(lengths, dtype=np.int32)
+        self.pitches = np.asarray(pitches, dtype=np.float64)
+        self.rms = np.asarray(rms, dtype=np.float32)
+        # Pre-rendered grain banks (see GranularSynthesizer.grain_bank)
+        self.banks: dict = {}
+
+    @classmethod
+    def from_grains(cls, grains: List[Grain]) -> "GrainLibrary":
+        """Pack a list of Grain objects."""
+        lengths = np.array([len(g.audio) for g in grains], dtype=np.int32)
+        offsets = np.zeros(len(grains), dtype=np.int64)
+        if len(grains) > 1:
+            np.cumsum(lengths[:-1], out=offsets[1:])
+
+        samples = (
+            np.concatenate([g.audio for g in grains])
+            .astype(np.float32, copy=False)
+            if grains else np.zeros(0, dtype=np.float32)
+        )
+
+        return cls(
+            samples=samples,
+            offsets=offsets,
+            lengths=lengths,
+            pitches=[g.pitch for g in grains],
+            rms=[g.rms for g in grains]
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> Grain:
+        offset = int(self.offsets[i])
+        return Grain(
+            audio=self.samples[offset:offset + int(self.lengths[i])],
+            pitch=float(self.pitches[i]),
+            rms=float(self.rms[i])
+        )
+
+    def __iter__(self) -> Iterator[Grain]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @cached_property
+    def index(self) -> GrainIndex:
+        """Pitch index, built once per library."""
+        return GrainIndex(self.pitches)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the serialized library."""
+        arrays = (
+            self.offsets, self.pitches, self.lengths, self.rms, self.samples
+        )
+        return self._HEADER.size + sum(a.nbytes for a in arrays)
+
+    def to_bytes(self) -> bytes:
+        """Serialize to the versioned binary layout."""
+        header = self._HEADER.pack(
+            self.MAGIC, self.VERSION, 0, len(self), len(self.samples)
+        )
+        return b"".join([
+            header,
+            self.offsets.astype("<i8", copy=False).tobytes(),
+            self.pitches.astype("<f8", copy=False).tobytes(),
+            self.lengths.astype("<i4", copy=False).tobytes(),
+            self.rms.astype("<f4", copy=False).tobytes(),
+            self.samples.astype("<f4", copy=False).tobytes(),
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GrainLibrary":
+        """
+        Deserialize without copying: every array is a read-only view
+        into ``data``.
+
+        Raises:
+            ValueError: If data is not a supported grain library
+        """
+        if len(data) < cls._HEADER.size:
+            raise ValueError("Truncated grain library")
+
+        magic, version, _, n_grains, n_samples = cls._HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a grain library")
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported grain library version: {version}")
+
+        pos = cls._HEADER.size
+        arrays = []
+        for dtype, count in (
+            ("<i8", n_grains),
+            ("<f8", n_grains),
+            ("<i4", n_grains),
+            ("<f4", n_grains),
+            ("<f4", n_samples),
+        ):
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=pos)
+            arrays.append(array)
+            pos += array.nbytes
+
+        offsets, pitches, lengths, rms, samples = arrays
+        return cls(samples, offsets, lengths, pitches, rms)
+
+
 class GrainBuilder:
     """Build grain library from style audio file."""
 
@@ -20,7 +160,11 @@ class GrainBuilder:
         self.sample_rate = sample_rate
         self.pitch_analyzer = PitchAnalyzer(sample_rate)
 
-    def build_library(self, audio: np.ndarray, top_db: int = 20) -> List[Grain]:
+    def build_library(
+        self,
+        audio: np.ndarray,
+        top_db: int = 20
+    ) -> GrainLibrary:
         """
         Slice audio by silence and analyze each grain.
 
@@ -29,7 +173,7 @@ class GrainBuilder:
             top_db: Threshold for silence detection
 
         Returns:
-            List of Grain objects
+            GrainLibrary with every grain packed into one buffer
         """
         # Detect non-silent regions
         intervals = librosa.effects.split(audio, top_db=top_db)
@@ -53,4 +197,4 @@ class GrainBuilder:
                 rms=rms
             ))
 
-        return grains
+        return GrainLibrary.from_grains(grains)
@@ -0,0 +1,98 @@
+# src/services/grain_index.py
+import numpy as np
+from typing import Optional, Sequence
+
+
+class GrainIndex:
+    """
+    Pitch-sorted index over a grain library.
+
+    Nearest-pitch lookup is a binary search over the sorted pitches
+    instead of a scan over every grain, and resolves ties exactly like
+    ``min(library, key=lambda g: abs(g.pitch - target))``: the grain that
+    comes first in the library wins.
+    """
+
+    def __init__(self, pitches: Sequence[float]):
+        pitches = np.asarray(pitches, dtype=np.float64)
+
+        # Stable sort keeps library order within runs of equal pitch
+        self.order = np.argsort(pitches, kind="stable")
+        self.sorted_pitches = pitches[self.order]
+
+    @classmethod
+    def from_library(cls, library) -> "GrainIndex":
+        """Build index from a sequence of grains."""
+        return cls([grain.pitch for grain in library])
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def nearest(self, target_pitches) -> np.ndarray:
+        """
+        Library index of the closest-pitch grain for every target.
+
+        Args:
+            target_pitches: Target pitches in Hz
+
+        Returns:
+            Array of indices into the library
+        """
+        targets = np.atleast_1d(np.asarray(target_pitches, dtype=np.float64))
+        sorted_pitches = self.sorted_pitches
+        n = len(sorted_pitches)
+
+        # First grain with pitch >= target starts its run of equal pitches
+        pos = np.searchsorted(sorted_pitches, targets, side="left")
+
+        # Closest grain below the target, moved to the start of its run
+        below = np.maximum(pos - 1, 0)
+        below = np.searchsorted(
+            sorted_pitches, sorted_pitches[below], side="left"
+        )
+        above = np.where(pos < n, pos, below)
+
+        dist_below = np.abs(sorted_pitches[below] - targets)
+        dist_above = np.abs(sorted_pitches[above] - targets)
+        idx_below = self.order[below]
+        idx_above = self.order[above]
+
+        return np.where(
+            dist_below < dist_above,
+            idx_below,
+            np.where(
+                dist_above < dist_below,
+                idx_above,
+                np.minimum(idx_below, idx_above)
+            )
+        )
+
+    def select(
+        self,
+        target_pitches,
+        rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Select a grain for every target pitch in one call.
+
+        Targets of 0 (unvoiced, drums, pitch mapping disabled) get a
+        random grain.
+
+        Args:
+            target_pitches: Target pitches in Hz
+            rng: Random generator for unpitched targets
+
+        Returns:
+            Array of indices into the library
+        """
+        targets = np.atleast_1d(np.asarray(target_pitches, dtype=np.float64))
+        indices = self.nearest(targets)
+
+        unpitched = targets == 0
+        if unpitched.any():
+            rng = rng or np.random.default_rng()
+            indices[unpitched] = rng.integers(
+                0, len(self), size=int(unpitched.sum())
+            )
+
+        return indices
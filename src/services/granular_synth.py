@@ -1,11 +1,14 @@
 # src/services/granular_synth.py
 import numpy as np
-import random
 from typing import List, Optional
-from src.services.grain_builder import Grain
+from src.services.audio_loader import processing_dtype
+from src.config.settings import get_settings
+from src.services.grain_builder import GrainLibrary
 from src.services.onset_detector import OnsetDetector
 from src.services.pitch_analyzer import PitchAnalyzer
 
+settings = get_settings()
+
 
 class GranularSynthesizer:
     """
@@ -17,99 +20,215 @@ class GranularSynthesizer:
         sample_rate: int = 44100,
         grain_duration_ms: int = 120,
         use_pitch_mapping: bool = True,
-        use_envelope: bool = True
+        use_envelope: bool = True,
+        seed: Optional[int] = None,
+        dtype=None
     ):
         self.sample_rate = sample_rate
+        self.dtype = processing_dtype(dtype)
         self.grain_duration_ms = grain_duration_ms
         self.use_pitch_mapping = use_pitch_mapping
         self.use_envelope = use_envelope
 
         self.decay_samples = int(sample_rate * (grain_duration_ms / 1000))
-        self.envelope = np.linspace(1.0, 0.0, num=self.decay_samples)
+        self.envelope = np.linspace(
+            1.0, 0.0, num=self.decay_samples, dtype=self.dtype
+        )
 
         self.onset_detector = OnsetDetector(sample_rate)
         self.pitch_analyzer = PitchAnalyzer(sample_rate)
+        self.rng = np.random.default_rng(seed)
 
     def synthesize(
         self,
         base_stem: np.ndarray,
-        grain_library: List[Grain],
-        instrument_type: str = "melodic"  # "melodic" or "drums"
+        grain_library: GrainLibrary,
+        instrument_type: str = "melodic",  # "melodic" or "drums"
+        onset_table: Optional[List[dict]] = None,
+        seed: Optional[int] = None
     ) -> np.ndarray:
         """
         Synthesize track using grains.
 
         Args:
             base_stem: Original stem audio
-            grain_library: List of available grains
+            grain_library: Library of available grains
             instrument_type: Type of instrument (affects pitch mapping)
+            onset_table: Precomputed ``{"start", "pitch", "peak"}`` per onset
+                (PitchAnalyzer.analyze_at_onsets over a window of
+                grain_duration_ms). Onset and pitch detection are skipped
+                when given.
+            seed: Seed for this call's grain selection, so a shared
+                synthesizer gives reproducible output (default: self.rng)
 
         Returns:
             Synthesized audio array
         """
         if not grain_library:
-            return np.zeros(len(base_stem))
-
-        # Detect onsets in base stem
-        onset_data = self.onset_detector.detect(base_stem)
-        onset_samples = onset_data["samples"]
+            return np.zeros(len(base_stem), dtype=self.dtype)
 
-        # Output buffer
-        output = np.zeros(len(base_stem))
+        with_pitch = self.use_pitch_mapping and instrument_type != "drums"
 
-        for onset in onset_samples:
-            # Extract segment for analysis
-            end = min(onset + self.decay_samples, len(base_stem))
-            segment = base_stem[onset:end]
+        if onset_table is None:
+            # Detect onsets in base stem
+            onset_data = self.onset_detector.detect(base_stem)
 
-            if len(segment) == 0:
-                continue
+            # Peak and target pitch of every onset window
+            onset_table = self._analyze_onsets(
+                base_stem,
+                onset_data["samples"],
+                with_pitch=with_pitch
+            )
 
-            peak_vol = float(np.max(np.abs(segment)))
+        # Select grains for all onsets at once
+        targets = [
+            entry["pitch"] if with_pitch else 0.0 for entry in onset_table
+        ]
+        rng = self.rng if seed is None else np.random.default_rng(seed)
+        grain_ids = grain_library.index.select(targets, rng)
 
-            # Determine target pitch
-            target_pitch = 0.0
-            if self.use_pitch_mapping and instrument_type != "drums":
-                target_pitch = self.pitch_analyzer.analyze_segment(segment)
+        # Output buffer
+        output = np.zeros(len(base_stem), dtype=self.dtype)
+
+        starts = np.fromiter(
+            (entry["start"] for entry in onset_table),
+            dtype=np.int64,
+            count=len(onset_table)
+        )
+        amplitudes = np.fromiter(
+            (entry["peak"] for entry in onset_table),
+            dtype=self.dtype,
+            count=len(onset_table)
+        )
+        self._overlap_add(output, grain_library, grain_ids, starts, amplitudes)
 
-            # Select grain
-            grain = self._select_grain(grain_library, target_pitch)
-            if grain is None:
-                continue
+        return output
 
-            # Process and insert grain
-            processed = self._process_grain(grain.audio, peak_vol)
+    @property
+    def bank_key(self) -> tuple:
+        """What a grain bank depends on besides the library."""
+        return (self.decay_samples, self.use_envelope, self.dtype.name)
 
-            # Additive mixing
-            end_pos = min(onset + len(processed), len(output))
-            actual_len = end_pos - onset
-            output[onset:end_pos] += processed[:actual_len]
+    def grain_bank(self, grain_library: GrainLibrary) -> Optional[np.ndarray]:
+        """
+        Pre-rendered grain bank of a library for these settings.
 
-        return output
+        A contiguous (n_grains, decay_samples) matrix holding every grain
+        tiled or truncated to decay_samples and enveloped, so placing a
+        grain is a row lookup plus an amplitude multiply. It is kept on
+        the library (``grain_library.banks``) and reused by every
+        synthesizer with the same bank_key; callers may also seed it there
+        from a shared cache.
 
-    def _select_grain(
+        Returns:
+            The bank, or None if it would exceed GRAIN_BANK_MAX_MB
+        """
+        bank = grain_library.banks.get(self.bank_key)
+        if bank is not None:
+            return bank
+
+        nbytes = len(grain_library) * self.decay_samples * self.dtype.itemsize
+        if nbytes > settings.GRAIN_BANK_MAX_MB * 1024 * 1024:
+            return None
+
+        bank = self._render_grains(
+            grain_library,
+            np.arange(len(grain_library))
+        )
+        grain_library.banks[self.bank_key] = bank
+        return bank
+
+    def _render_grains(
         self,
-        library: List[Grain],
-        target_pitch: float
-    ) -> Optional[Grain]:
-        """Select most suitable grain."""
-        if target_pitch == 0:
-            return random.choice(library)
-
-        # Find grain with closest pitch
-        return min(library, key=lambda g: abs(g.pitch - target_pitch))
-
-    def _process_grain(self, grain_audio: np.ndarray, amplitude: float) -> np.ndarray:
-        """Process grain applying envelope and amplitude."""
-        # Adjust size
-        if len(grain_audio) < self.decay_samples:
-            repeats = int(np.ceil(self.decay_samples / len(grain_audio)))
-            grain_ready = np.tile(grain_audio, repeats)[:self.decay_samples]
-        else:
-            grain_ready = grain_audio[:self.decay_samples]
-
-        # Apply envelope and amplitude
+        grain_library: GrainLibrary,
+        grain_ids: np.ndarray
+    ) -> np.ndarray:
+        """Grains tiled/truncated to decay_samples, enveloped, one per row."""
+        cols = np.arange(self.decay_samples)
+        offsets = grain_library.offsets[grain_ids, None]
+        index = offsets + cols % grain_library.lengths[grain_ids, None]
+        rendered = grain_library.samples[index].astype(self.dtype, copy=False)
         if self.use_envelope:
-            return (grain_ready * self.envelope) * amplitude
+            rendered *= self.envelope
+        return rendered
 
-        return grain_ready * amplitude
+    def _overlap_add(
+        self,
+        output: np.ndarray,
+        grain_library: GrainLibrary,
+        grain_ids: np.ndarray,
+        starts: np.ndarray,
+        amplitudes: np.ndarray,
+        block_samples: int = 1 << 16
+    ):
+        """
+        Add the processed grain of every onset into ``output``.
+
+        Same result, bit for bit, as tiling or truncating each grain to
+        decay_samples, enveloping and scaling it, and adding it with a
+        sliced ``+=`` in onset order (tests/overlap_add_reference.py).
+        Rows come from the library's grain bank (or, for a library too
+        large for one, from the distinct grains used, rendered once);
+        blocks of onsets are gathered from them and scaled as
+        (onsets x decay_samples) matrices. Only the accumulation stays a
+        per-row slice add, because overlapping grains must be summed in
+        onset order to give the same float rounding (np.add.at keeps the
+        order but is several times slower than the slices).
+
+        Args:
+            output: Buffer to accumulate into (modified in place)
+            grain_library: Library the grain ids refer to
+            grain_ids: Grain per onset
+            starts: Onset sample per onset
+            amplitudes: Peak amplitude per onset (output dtype)
+            block_samples: Matrix size per block (small enough for the cache)
+        """
+        decay = self.decay_samples
+        if decay == 0 or len(starts) == 0:
+            return
+
+        bank = self.grain_bank(grain_library)
+        if bank is None:
+            used, grain_ids = np.unique(grain_ids, return_inverse=True)
+            bank = self._render_grains(grain_library, used)
+
+        # Grains running past the end are truncated
+        ends = np.minimum(starts + decay, len(output)).tolist()
+        rows = max(1, block_samples // decay)
+
+        for i in range(0, len(starts), rows):
+            block = bank[grain_ids[i:i + rows]]
+            block *= amplitudes[i:i + rows, None]
+
+            block_starts = starts[i:i + rows].tolist()
+            for row, start, end in zip(block, block_starts, ends[i:i + rows]):
+                output[start:end] += row[:end - start]
+
+    def _analyze_onsets(
+        self,
+        base_stem: np.ndarray,
+        onset_samples: list[int],
+        with_pitch: bool
+    ) -> list[dict]:
+        """Peak (and pitch, if needed) of every onset window."""
+        if with_pitch:
+            # One pYIN pass per window, or over the whole stem when the
+            # onsets are dense enough for that to be cheaper
+            return self.pitch_analyzer.analyze_at_onsets(
+                base_stem,
+                onset_samples,
+                window_ms=self.grain_duration_ms
+            )
+
+        starts = [
+            onset for onset in onset_samples if 0 <= onset < len(base_stem)
+        ]
+        peaks = self.pitch_analyzer.window_peaks(
+            base_stem,
+            starts,
+            self.decay_samples
+        )
+        return [
+            {"start": start, "pitch": 0.0, "peak": float(peak)}
+            for start, peak in zip(starts, peaks)
+        ]
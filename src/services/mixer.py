@@ -1,6 +1,70 @@
 # src/services/mixer.py
 import numpy as np
 import soundfile as sf
+from src.services.audio_loader import processing_dtype
+
+
+class MixBus:
+    """
+    In-place accumulator for stems.
+
+    Each stem (or chunk of a stem) is scaled and added straight into the
+    output slice it covers, through a small reusable scratch block, so
+    no padded or scaled full-length copies are made. The buffer grows as
+    chunks arrive, which lets stems be mixed as soon as they are produced.
+    """
+
+    def __init__(self, length: int = 0, dtype=None, block_size: int = 65536):
+        self.dtype = processing_dtype(dtype)
+        self.buffer = np.zeros(length, dtype=self.dtype)
+        self.length = length
+        self.block_size = block_size
+        self._scratch = np.empty(block_size, dtype=self.dtype)
+
+    def _reserve(self, length: int):
+        """Grow buffer to hold at least ``length`` samples."""
+        if length <= len(self.buffer):
+            return
+        grown = np.zeros(max(length, 2 * len(self.buffer)), dtype=self.dtype)
+        grown[:self.length] = self.buffer[:self.length]
+        self.buffer = grown
+
+    def add(self, audio: np.ndarray, volume: float = 1.0, offset: int = 0):
+        """
+        Accumulate ``audio * volume`` starting at sample ``offset``.
+
+        Args:
+            audio: Stem audio or a chunk of it
+            volume: Gain applied while accumulating
+            offset: Position of the first sample in the output
+        """
+        end = offset + len(audio)
+        self._reserve(end)
+        self.length = max(self.length, end)
+
+        target = self.buffer[offset:end]
+        if volume == 1.0:
+            target += audio
+            return
+
+        volume = self.dtype.type(volume)
+        for start in range(0, len(audio), self.block_size):
+            stop = min(start + self.block_size, len(audio))
+            scratch = self._scratch[:stop - start]
+            np.multiply(audio[start:stop], volume, out=scratch)
+            target[start:stop] += scratch
+
+    def render(self, normalize: bool = False) -> np.ndarray:
+        """
+        Mixed output (a view of the internal buffer).
+
+        Args:
+            normalize: Scale in place so the peak is 1.0
+        """
+        output = self.buffer[:self.length]
+        if normalize:
+            AudioMixer.normalize(output, in_place=True)
+        return output
 
 
 class AudioMixer:
@@ -9,7 +73,9 @@ class AudioMixer:
     @staticmethod
     def mix(
         stems: dict[str, np.ndarray],
-        volumes: dict[str, float] = None
+        volumes: dict[str, float] = None,
+        dtype=None,
+        normalize: bool = False
     ) -> np.ndarray:
         """
         Combine multiple stems into single audio.
@@ -17,6 +83,8 @@ class AudioMixer:
         Args:
             stems: Dict of stem name to audio array
             volumes: Optional volume levels for each stem
+            dtype: Output dtype (default: AUDIO_DTYPE)
+            normalize: Normalize the result in the same pass
 
         Returns:
             Mixed audio array
@@ -24,23 +92,29 @@ class AudioMixer:
         volumes = volumes or {}
 
         # Find maximum length
-        max_len = max(len(s) for s in stems.values())
+        max_len = max((len(s) for s in stems.values()), default=0)
 
         # Mix
-        output = np.zeros(max_len)
+        bus = MixBus(max_len, dtype=dtype)
         for name, audio in stems.items():
-            vol = volumes.get(name, 1.0)
-            padded = np.pad(audio, (0, max_len - len(audio)))
-            output += padded * vol
+            bus.add(audio, volumes.get(name, 1.0))
 
-        return output
+        return bus.render(normalize=normalize)
 
     @staticmethod
-    def normalize(audio: np.ndarray) -> np.ndarray:
+    def normalize(audio: np.ndarray, in_place: bool = False) -> np.ndarray:
         """Normalize audio to avoid clipping."""
-        max_val = np.max(np.abs(audio))
+        if len(audio) == 0:
+            return audio
+
+        # Peak without materializing np.abs(audio)
+        max_val = max(audio.max(), -audio.min())
         if max_val > 0:
-            return audio / max_val
+            scale = audio.dtype.type(max_val)
+            if in_place:
+                audio /= scale
+                return audio
+            return audio / scale
         return audio
 
     @staticmethod
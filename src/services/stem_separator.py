@@ -1,46 +1,255 @@
 # src/services/stem_separator.py
-import subprocess
-import os
-from pathlib import Path
+import numpy as np
+from typing import Optional
 from src.config.settings import get_settings
 
 settings = get_settings()
 
 
+class SeparationEngine:
+    """
+    Demucs model kept in memory for the life of a worker process.
+
+    Loading torch and the model weights happens once; every separation
+    then runs through the Demucs Python API on tensors.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        device: Optional[str] = None,
+        segment: Optional[float] = None,
+        overlap: float = 0.25,
+        shifts: int = 1,
+        threads: int = 0
+    ):
+        # torch/demucs are only needed on separation workers
+        import torch
+        from demucs.pretrained import get_model
+
+        if threads > 0:
+            torch.set_num_threads(threads)
+
+        self.torch = torch
+        self.model_name = model
+        if not device:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = device
+        self.segment = segment
+        self.overlap = overlap
+        self.shifts = shifts
+
+        self.model = get_model(model)
+        self.model.to(self.device)
+        self.model.eval()
+
+        self.sample_rate = self.model.samplerate
+        self.sources = list(self.model.sources)
+
+    def load_audio(self, input_path: str):
+        """Decode file to a (channels, samples) tensor at the model rate."""
+        from demucs.audio import AudioFile
+
+        return AudioFile(input_path).read(
+            streams=0,
+            samplerate=self.sample_rate,
+            channels=self.model.audio_channels
+        )
+
+    def separate_tensor(
+        self,
+        wav,
+        stats: Optional[tuple[float, float]] = None
+    ) -> dict:
+        """
+        Separate a (channels, samples) tensor.
+
+        Args:
+            wav: Audio at the model rate
+            stats: (mean, std) to normalize with; by default those of wav.
+                Chunks of a track pass the whole track's, so every chunk
+                is scaled like the whole-file separation would be.
+
+        Returns:
+            Dict of source name to (channels, samples) tensor
+        """
+        from demucs.apply import apply_model
+
+        # Same normalization as the demucs CLI
+        mean, std = stats or normalization_stats(wav)
+        wav = (wav - mean) / std
+
+        with self.torch.no_grad():
+            sources = apply_model(
+                self.model,
+                wav[None],
+                device=self.device,
+                shifts=self.shifts,
+                split=True,
+                overlap=self.overlap,
+                segment=self.segment
+            )[0]
+
+        sources = sources * std + mean
+        return dict(zip(self.sources, sources))
+
+
+def normalization_stats(wav) -> tuple[float, float]:
+    """Mean and std of the channel-averaged signal (as the demucs CLI)."""
+    ref = wav.mean(0)
+    return float(ref.mean()), float(ref.std())
+
+
+def chunk_bounds(
+    n_samples: int,
+    chunk_samples: int,
+    overlap_samples: int
+) -> list[tuple[int, int]]:
+    """
+    Split a track into equal, overlapping chunks for parallel separation.
+
+    Chunks are at most ``chunk_samples`` long and neighbours share
+    ``overlap_samples``; a track that fits in one chunk is not split.
+
+    Returns:
+        List of (start, end) sample ranges covering [0, n_samples)
+    """
+    if chunk_samples <= 0 or n_samples <= chunk_samples:
+        return [(0, n_samples)]
+
+    step = chunk_samples - overlap_samples
+    n_chunks = -(-(n_samples - overlap_samples) // step)
+    # Balance chunk lengths
+    step = -(-(n_samples - overlap_samples) // n_chunks)
+    return [
+        (i * step, min(i * step + step + overlap_samples, n_samples))
+        for i in range(n_chunks)
+    ]
+
+
+def stitch_chunks(
+    chunks: list[np.ndarray],
+    bounds: list[tuple[int, int]],
+    fade_samples: int
+) -> np.ndarray:
+    """
+    Crossfade separated chunks back into one signal.
+
+    Within each overlap only the middle ``fade_samples`` are crossfaded
+    (linear, complementary gains); the outer parts of the overlap are
+    taken from the chunk they lie further inside of, since a chunk's
+    own edges are separated without context.
+
+    Args:
+        chunks: (samples, channels) arrays, one per range in bounds
+        bounds: (start, end) ranges from chunk_bounds()
+        fade_samples: Crossfade length, at most the overlap
+
+    Returns:
+        (samples, channels) array of length bounds[-1][1]
+    """
+    output = np.zeros(
+        (bounds[-1][1],) + chunks[0].shape[1:],
+        dtype=chunks[0].dtype
+    )
+
+    for i, (chunk, (start, end)) in enumerate(zip(chunks, bounds)):
+        gain = np.ones(end - start, dtype=chunk.dtype)
+
+        if i > 0:
+            overlap = bounds[i - 1][1] - start
+            fade = min(fade_samples, overlap)
+            head = (overlap - fade) // 2
+            gain[:head] = 0
+            gain[head:head + fade] = (np.arange(fade) + 0.5) / fade
+
+        if i < len(bounds) - 1:
+            next_start = bounds[i + 1][0]
+            overlap = end - next_start
+            fade = min(fade_samples, overlap)
+            tail = next_start - start + (overlap - fade) // 2
+            gain[tail:tail + fade] = 1 - (np.arange(fade) + 0.5) / fade
+            gain[tail + fade:] = 0
+
+        output[start:end] += chunk * gain[:, None]
+
+    return output
+
+
+_engine: Optional[SeparationEngine] = None
+
+
+def get_separation_engine() -> SeparationEngine:
+    """Process-wide engine, created on first use (or at worker start)."""
+    global _engine
+    if _engine is None:
+        _engine = SeparationEngine(
+            settings.DEMUCS_MODEL,
+            device=settings.DEMUCS_DEVICE or None,
+            segment=settings.DEMUCS_SEGMENT or None,
+            overlap=settings.DEMUCS_OVERLAP,
+            shifts=settings.DEMUCS_SHIFTS,
+            threads=settings.DEMUCS_THREADS
+        )
+    return _engine
+
+
 class StemSeparator:
     """Wrapper for stem separation using Demucs."""
 
     def __init__(self, model: str = None):
         self.model = model or settings.DEMUCS_MODEL
 
-    def separate(self, input_path: str, output_dir: str) -> dict[str, str]:
+    @property
+    def engine(self) -> SeparationEngine:
+        engine = get_separation_engine()
+        if engine.model_name != self.model:
+            raise ValueError(
+                f"Worker engine runs {engine.model_name}, not {self.model}"
+            )
+        return engine
+
+    @property
+    def sample_rate(self) -> int:
+        return self.engine.sample_rate
+
+    def load(self, input_path: str) -> np.ndarray:
+        """Decode a file to (channels, samples) float32 at ``sample_rate``."""
+        wav = self.engine.load_audio(input_path).numpy()
+        return wav.astype(np.float32, copy=False)
+
+    def separate(self, input_path: str) -> dict[str, np.ndarray]:
         """
         Separate audio file into 4 stems.
 
         Args:
             input_path: Path to input audio file
-            output_dir: Directory for output stems
 
         Returns:
-            Dict with stem paths: {vocals, drums, bass, other}
+            Dict of stem name {vocals, drums, bass, other} to
+            (samples, channels) float32 array at ``sample_rate``
         """
-        # Execute Demucs
-        cmd = [
-            "python", "-m", "demucs",
-            "-n", self.model,
-            "-o", output_dir,
-            input_path
-        ]
+        return self.separate_array(self.load(input_path))
 
-        subprocess.run(cmd, check=True, capture_output=True)
+    def separate_array(
+        self,
+        wav: np.ndarray,
+        stats: Optional[tuple[float, float]] = None
+    ) -> dict[str, np.ndarray]:
+        """
+        Separate a (channels, samples) array at ``sample_rate`` (a whole
+        track, or one chunk of it with the track's normalization stats).
 
-        # Build output paths
-        input_name = Path(input_path).stem
-        stems_dir = Path(output_dir) / self.model / input_name
+        Returns:
+            Dict of stem name to (samples, channels) float32 array
+        """
+        engine = self.engine
+        sources = engine.separate_tensor(
+            engine.torch.from_numpy(np.ascontiguousarray(wav)),
+            stats
+        )
 
         return {
-            "vocals": str(stems_dir / "vocals.wav"),
-            "drums": str(stems_dir / "drums.wav"),
-            "bass": str(stems_dir / "bass.wav"),
-            "other": str(stems_dir / "other.wav"),
+            name: source.cpu().numpy().T.astype(np.float32, copy=False)
+            for name, source in sources.items()
         }
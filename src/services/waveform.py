@@ -0,0 +1,25 @@
+# src/services/waveform.py
+import numpy as np
+
+
+def waveform_peaks(audio: np.ndarray, buckets: int = 2000) -> dict:
+    """
+    Min/max envelope of a mono signal, for drawing its waveform.
+
+    Args:
+        audio: Mono samples
+        buckets: Number of (min, max) pairs (fewer for shorter signals)
+
+    Returns:
+        Dict with ``min`` and ``max`` lists of length ``buckets``
+    """
+    if len(audio) == 0:
+        return {"min": [], "max": []}
+
+    buckets = min(buckets, len(audio))
+    starts = np.linspace(0, len(audio), buckets, endpoint=False)
+    starts = starts.astype(np.int64)
+    return {
+        "min": np.round(np.minimum.reduceat(audio, starts), 4).tolist(),
+        "max": np.round(np.maximum.reduceat(audio, starts), 4).tolist(),
+    }
@@ -0,0 +1,93 @@
+# src/storage/artifact_cache.py
+import hashlib
+import os
+import tempfile
+import numpy as np
+from pathlib import Path
+from src.storage.minio_client import MinIOClient
+
+
+def stem_artifact_path(stem_path: str) -> str:
+    """Storage path of the decoded float32 artifact next to a stem WAV."""
+    root, _ = os.path.splitext(stem_path)
+    return f"{root}.f32.npy"
+
+
+class LocalArtifactCache:
+    """
+    Size-bounded LRU disk cache of storage objects on a worker.
+
+    Entries are keyed by object path + etag, so a changed object is
+    fetched again. Arrays are opened with np.memmap (via np.load), so a
+    warm hit costs one stat request and no transfer or decode. Several
+    worker processes may share the directory: files are written to a
+    temp name and renamed into place.
+    """
+
+    def __init__(self, storage: MinIOClient, cache_dir: str, max_bytes: int):
+        self.storage = storage
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, remote_path: str, etag: str) -> Path:
+        key = hashlib.sha256(remote_path.encode()).hexdigest()[:32]
+        etag = etag.strip('"')
+        return self.cache_dir / f"{key}-{etag}{Path(remote_path).suffix}"
+
+    def fetch(self, remote_path: str) -> Path:
+        """Local path of an object, downloading it on a miss."""
+        etag = self.storage.stat(remote_path).etag
+        local_path = self._entry_path(remote_path, etag)
+
+        if local_path.exists():
+            # Mark as recently used
+            os.utime(local_path)
+            return local_path
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        os.close(fd)
+        try:
+            self.storage.download(remote_path, tmp_path)
+            os.replace(tmp_path, local_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._evict(keep=local_path)
+        return local_path
+
+    def open_array(self, remote_path: str) -> np.ndarray:
+        """Memory-map a cached .npy object (read-only)."""
+        return np.load(self.fetch(remote_path), mmap_mode="r")
+
+    def put_array(self, remote_path: str, etag: str, array: np.ndarray):
+        """Seed the cache with an array that was just uploaded."""
+        local_path = self._entry_path(remote_path, etag)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(tmp_path, local_path)
+        self._evict(keep=local_path)
+
+    def _evict(self, keep: Path = None):
+        """Delete LRU entries (except ``keep``) until under max_bytes."""
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.suffix == ".part" or path == keep:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if keep is not None and keep.exists():
+            total += keep.stat().st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            # Open memmaps stay valid after unlink
+            path.unlink(missing_ok=True)
+            total -= size
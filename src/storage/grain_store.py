@@ -0,0 +1,179 @@
+# src/storage/grain_store.py
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+from minio.error import S3Error
+from src.cache.redis_client import RedisCache
+from src.services.grain_builder import GrainLibrary
+from src.storage.minio_client import MinIOClient
+
+# Seconds a rebuild may hold (or wait for) the per-style lock
+GRAIN_BUILD_LOCK_TIMEOUT = 600
+
+STATS_KEY = "stats:grains"  # Hash of counters shared by all processes
+
+
+def _decode(data: Optional[bytes]) -> Optional[GrainLibrary]:
+    """Library from its binary layout (None if missing or outdated)."""
+    if not data:
+        return None
+    try:
+        return GrainLibrary.from_bytes(data)
+    except ValueError:
+        return None  # Written in an older format: rebuild
+
+
+class GrainLibraryStore:
+    """
+    Tiered grain library cache.
+
+    Lookups go through a process-local LRU (libraries keep their
+    pre-rendered grain banks there), then Redis (``grains:{style_id}``,
+    expiring), then the durable copy in storage
+    (``grains/{style_id}/library.bin``); a lower tier hit refills the
+    tiers above it. Only a library missing from all three needs a rebuild,
+    which callers run under build_lock() so concurrent mixes wait for one
+    build instead of each rebuilding.
+
+    Grain banks on the cached libraries share a budget of max_bank_bytes
+    per process: past it, the banks of the least recently used libraries
+    are dropped (and rebuilt or refetched when needed again).
+
+    Counters (in the ``stats:grains`` Redis hash): local_hits, redis_hits,
+    storage_hits, misses, builds.
+    """
+
+    def __init__(
+        self,
+        storage: MinIOClient,
+        cache: RedisCache,
+        max_local: int = 8,
+        max_bank_bytes: int = 256 * 1024 * 1024,
+        ttl: int = 86400
+    ):
+        self.storage = storage
+        self.cache = cache
+        self.max_local = max_local
+        self.max_bank_bytes = max_bank_bytes
+        self.ttl = ttl
+        self._local: OrderedDict[str, GrainLibrary] = OrderedDict()
+
+    @staticmethod
+    def redis_key(style_id: str) -> str:
+        """Redis key of a library (also StyleSound.grain_cache_key)."""
+        return f"grains:{style_id}"
+
+    @staticmethod
+    def path(style_id: str) -> str:
+        """Storage path of a library."""
+        return f"grains/{style_id}/library.bin"
+
+    def get(self, style_id: str, count: bool = True) -> Optional[GrainLibrary]:
+        """Library of a style sound from the fastest tier with it, or None."""
+        library = self._local.get(style_id)
+        if library is not None:
+            self._local.move_to_end(style_id)
+            self._count("local_hits", count)
+            return library
+
+        library = _decode(self.cache.get_bytes(self.redis_key(style_id)))
+        if library is not None:
+            self._remember(style_id, library)
+            self._count("redis_hits", count)
+            return library
+
+        data = None
+        try:
+            data = self.storage.download_bytes(self.path(style_id))
+        except S3Error as e:
+            if e.code != "NoSuchKey":
+                raise
+        library = _decode(data)
+
+        if library is not None:
+            self.cache.set_bytes(self.redis_key(style_id), data, ttl=self.ttl)
+            self._remember(style_id, library)
+            self._count("storage_hits", count)
+            return library
+
+        self._count("misses", count)
+        return None
+
+    def put(self, style_id: str, library: GrainLibrary):
+        """Store a freshly built library in every tier."""
+        data = library.to_bytes()
+        self.storage.upload_bytes(data, self.path(style_id))
+        self.cache.set_bytes(self.redis_key(style_id), data, ttl=self.ttl)
+        self._remember(style_id, library)
+        self._count("builds")
+
+    def add_bank(self, style_id: str, key: tuple, bank: np.ndarray):
+        """
+        Keep a grain bank on a cached library, within the bank budget.
+
+        Args:
+            style_id: Style sound of the library (must be in the local LRU)
+            key: GranularSynthesizer.bank_key the bank was rendered for
+            bank: The bank; always kept, older banks are dropped first
+        """
+        library = self._local.get(style_id)
+        if library is None:
+            return
+        self._local.move_to_end(style_id)
+        library.banks.pop(key, None)
+        library.banks[key] = bank
+        self._trim_banks()
+
+    def delete(self, style_id: str):
+        """Drop a library (and its grain banks) from every tier."""
+        self._local.pop(style_id, None)
+        self.cache.delete(self.redis_key(style_id))
+        self.cache.delete_prefix(f"{self.redis_key(style_id)}:bank:")
+        self.storage.delete_prefix(f"grains/{style_id}/")
+
+    def build_lock(self, style_id: str):
+        """Distributed lock serializing rebuilds of one library."""
+        return self.cache.lock(
+            f"lock:grains:{style_id}",
+            timeout=GRAIN_BUILD_LOCK_TIMEOUT,
+            blocking_timeout=GRAIN_BUILD_LOCK_TIMEOUT
+        )
+
+    def stats(self) -> dict:
+        """Shared counters plus this process's LRU size."""
+        counters = self.cache.client.hgetall(STATS_KEY)
+        stats = {k.decode(): int(v) for k, v in counters.items()}
+        stats["local_entries"] = len(self._local)
+        stats["local_bank_bytes"] = self._bank_bytes()
+        return stats
+
+    def _remember(self, style_id: str, library: GrainLibrary):
+        self._local[style_id] = library
+        self._local.move_to_end(style_id)
+        while len(self._local) > self.max_local:
+            self._local.popitem(last=False)
+
+    def _bank_bytes(self) -> int:
+        return sum(
+            bank.nbytes
+            for library in self._local.values()
+            for bank in library.banks.values()
+        )
+
+    def _trim_banks(self):
+        """Drop banks, least recently used library first, to max_bank_bytes."""
+        total = self._bank_bytes()
+        banks = [
+            (library, key)
+            for library in self._local.values()
+            for key in library.banks
+        ]
+        # The newest bank (just added, about to be used) is kept
+        for library, key in banks[:-1]:
+            if total <= self.max_bank_bytes:
+                break
+            total -= library.banks.pop(key).nbytes
+
+    def _count(self, name: str, count: bool = True):
+        if count:
+            self.cache.client.hincrby(STATS_KEY, name, 1)
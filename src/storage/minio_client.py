@@ -4,22 +4,103 @@ from minio.error import S3Error
 from src.config.settings import get_settings
 from io import BytesIO
 from datetime import timedelta
+from typing import BinaryIO, Optional
+import certifi
+import numpy as np
+import os
+import urllib3
 
 settings = get_settings()
 
+_storage: Optional["MinIOClient"] = None
+
+
+def _http_pool() -> urllib3.PoolManager:
+    """HTTP pool sized by MINIO_POOL_SIZE (otherwise Minio's defaults)."""
+    timeout = timedelta(minutes=5).seconds
+    return urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=timeout, read=timeout),
+        maxsize=settings.MINIO_POOL_SIZE,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(
+            total=5,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504]
+        )
+    )
+
+
+def get_storage() -> "MinIOClient":
+    """Process-wide MinIO client; the bucket check runs once."""
+    global _storage
+    if _storage is None:
+        _storage = MinIOClient(http_client=_http_pool())
+    return _storage
+
+
+def close_storage():
+    """Drop the shared client and its connections (shutdown, or after fork)."""
+    global _storage
+    if _storage is not None and _storage.http_client is not None:
+        _storage.http_client.clear()
+    _storage = None
+
+
+def pool_stats() -> dict:
+    """
+    HTTP connection pool usage of the shared client.
+
+    Read from the PoolManager this module created (never Minio's private
+    ``_http``). The per-host counters are plain attributes of urllib3's
+    connection pools; they read as None if an upgrade drops them (pinned
+    by tests/test_pool_stats.py).
+    """
+    if _storage is None or _storage.http_client is None:
+        return {
+            "hosts": 0,
+            "connections": 0,
+            "requests": 0,
+            "max_per_host": settings.MINIO_POOL_SIZE,
+        }
+    pools = _storage.http_client.pools
+    host_pools = [pools[key] for key in pools.keys()]
+    return {
+        "hosts": len(host_pools),
+        "connections": _total(host_pools, "num_connections"),
+        "requests": _total(host_pools, "num_requests"),
+        "max_per_host": settings.MINIO_POOL_SIZE,
+    }
+
+
+def _total(host_pools: list, counter: str) -> Optional[int]:
+    """Sum of a counter over the host pools (None if they lack it)."""
+    values = [getattr(pool, counter, None) for pool in host_pools]
+    if None in values:
+        return None
+    return sum(values)
+
 
 class MinIOClient:
     """Client for MinIO/S3 operations."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[urllib3.PoolManager] = None,
+        ensure_bucket: bool = True
+    ):
         self.client = Minio(
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE
+            secure=settings.MINIO_SECURE,
+            http_client=http_client
         )
+        # Ours to report on and clear (None: Minio's own pool)
+        self.http_client = http_client
         self.bucket = settings.MINIO_BUCKET
-        self._ensure_bucket()
+        if ensure_bucket:
+            self._ensure_bucket()
 
     def _ensure_bucket(self):
         """Create bucket if it doesn't exist."""
@@ -29,23 +110,68 @@ class MinIOClient:
         except S3Error as e:
             print(f"Error ensuring bucket: {e}")
 
-    def upload(self, local_path: str, remote_path: str):
-        """Upload local file."""
-        self.client.fput_object(self.bucket, remote_path, local_path)
+    def upload(self, local_path: str, remote_path: str) -> str:
+        """Upload local file; returns its etag."""
+        result = self.client.fput_object(self.bucket, remote_path, local_path)
+        return result.etag
 
-    def upload_bytes(self, data: bytes, remote_path: str):
-        """Upload bytes."""
-        self.client.put_object(
+    def upload_bytes(self, data: bytes, remote_path: str) -> str:
+        """Upload bytes; returns their etag."""
+        return self.client.put_object(
             self.bucket,
             remote_path,
             BytesIO(data),
             length=len(data)
+        ).etag
+
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        remote_path: str,
+        part_size: int = 5 * 1024 * 1024
+    ):
+        """
+        Upload a stream of unknown length as a multipart upload.
+
+        Parts are sent one at a time, so at most one part is buffered.
+        """
+        return self.client.put_object(
+            self.bucket,
+            remote_path,
+            stream,
+            length=-1,
+            part_size=part_size,
+            num_parallel_uploads=1
         )
 
+    def upload_array(self, array: np.ndarray, remote_path: str) -> str:
+        """Upload numpy array (.npy format); returns its etag."""
+        buffer = BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        return self.upload_bytes(buffer.getvalue(), remote_path)
+
+    def download_array(self, remote_path: str) -> np.ndarray:
+        """Download numpy array (.npy format)."""
+        data = self.download_bytes(remote_path)
+        return np.load(BytesIO(data), allow_pickle=False)
+
+    def download_bytes(self, remote_path: str) -> bytes:
+        """Download object into memory."""
+        response = self.client.get_object(self.bucket, remote_path)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
     def download(self, remote_path: str, local_path: str):
         """Download to local file."""
         self.client.fget_object(self.bucket, remote_path, local_path)
 
+    def stat(self, remote_path: str):
+        """Object metadata (etag, size, ...)."""
+        return self.client.stat_object(self.bucket, remote_path)
+
     def get_presigned_url(self, remote_path: str, expires: int = 3600) -> str:
         """Generate temporary download URL."""
         return self.client.presigned_get_object(
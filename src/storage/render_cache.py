@@ -0,0 +1,109 @@
+# src/storage/render_cache.py
+import hashlib
+import json
+import time
+from typing import Optional
+import numpy as np
+from minio.error import S3Error
+from src.cache.redis_client import RedisCache
+from src.storage.minio_client import MinIOClient
+
+# Bump when a change to synthesis alters rendered output
+RENDER_CACHE_VERSION = 1
+
+INDEX_KEY = "renders:index"  # Sorted set: render key -> last use (epoch)
+SIZES_KEY = "renders:sizes"  # Hash: render key -> bytes
+TOTAL_KEY = "renders:bytes"  # Total bytes indexed
+
+
+def render_key(parts: dict) -> str:
+    """Content key of a render from the inputs that determine it."""
+    payload = json.dumps(
+        {"version": RENDER_CACHE_VERSION, **parts},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RenderCache:
+    """
+    Size-bounded cache of synthesized stems in storage.
+
+    Renders are stored once under ``renders/{key}.npy``, where the key
+    hashes everything that determines the output (see render_key()), so
+    any mix with the same inputs reuses them. A Redis sorted set orders
+    them by last use; when the total exceeds max_bytes the least recently
+    used are deleted. Renders used within ``grace`` seconds are never
+    evicted, so a mix still being finalized keeps its inputs.
+    """
+
+    def __init__(
+        self,
+        storage: MinIOClient,
+        cache: RedisCache,
+        max_bytes: int,
+        grace: int = 900
+    ):
+        self.storage = storage
+        self.redis = cache.client
+        self.max_bytes = max_bytes
+        self.grace = grace
+
+    @staticmethod
+    def path(key: str) -> str:
+        """Storage path of a render."""
+        return f"renders/{key}.npy"
+
+    def get(self, key: str) -> Optional[str]:
+        """Storage path of a cached render (marked as used), or None."""
+        if self.redis.zscore(INDEX_KEY, key) is None:
+            # Not indexed: may still be in storage if Redis lost the index
+            try:
+                size = self.storage.stat(self.path(key)).size
+            except S3Error as e:
+                if e.code != "NoSuchKey":
+                    raise
+                return None
+            self._index(key, size)
+            return self.path(key)
+
+        self.redis.zadd(INDEX_KEY, {key: time.time()})
+        return self.path(key)
+
+    def put(self, key: str, audio: np.ndarray) -> str:
+        """Store a render and evict old ones if over budget."""
+        path = self.path(key)
+        self.storage.upload_array(audio, path)
+        self._index(key, audio.nbytes)
+        self._evict()
+        return path
+
+    def _index(self, key: str, size: int):
+        with self.redis.pipeline() as pipe:
+            pipe.zadd(INDEX_KEY, {key: time.time()})
+            pipe.hsetnx(SIZES_KEY, key, size)
+            _, created = pipe.execute()
+        # Count each render once, even if indexed concurrently
+        if created:
+            self.redis.incrby(TOTAL_KEY, size)
+
+    def _evict(self):
+        """Delete least recently used renders until under max_bytes."""
+        total = int(self.redis.get(TOTAL_KEY) or 0)
+        if total <= self.max_bytes:
+            return
+
+        cutoff = time.time() - self.grace
+        for member in self.redis.zrangebyscore(INDEX_KEY, "-inf", cutoff):
+            if total <= self.max_bytes:
+                break
+            # Whoever removes it from the index deletes it
+            if not self.redis.zrem(INDEX_KEY, member):
+                continue
+            key = member.decode()
+            size = int(self.redis.hget(SIZES_KEY, key) or 0)
+            with self.redis.pipeline() as pipe:
+                pipe.hdel(SIZES_KEY, key)
+                pipe.decrby(TOTAL_KEY, size)
+                total = pipe.execute()[-1]
+            self.storage.delete(self.path(key))
@@ -0,0 +1,42 @@
+# src/storage/streaming.py
+import hashlib
+from typing import BinaryIO
+
+# Bytes read from the source per call
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when a streamed upload exceeds its size limit."""
+
+
+class HashingReader:
+    """
+    File-like wrapper that hashes and size-checks data as it is read.
+
+    Meant to be handed to MinIOClient.upload_stream: the SHA-256 and byte
+    count are computed in the same pass that streams the upload, so the
+    whole file is never held in memory.
+    """
+
+    def __init__(self, source: BinaryIO, max_bytes: int):
+        self.source = source
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > CHUNK_SIZE:
+            size = CHUNK_SIZE
+
+        data = self.source.read(size)
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+
+        self._sha256.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        """SHA-256 of everything read so far."""
+        return self._sha256.hexdigest()
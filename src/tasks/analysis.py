@@ -3,97 +3,270 @@ from src.tasks.celery_app import celery_app
 from src.services.onset_detector import OnsetDetector
 from src.services.pitch_analyzer import PitchAnalyzer
 from src.services.grain_builder import GrainBuilder
-from src.storage.minio_client import MinIOClient
-from src.cache.redis_client import RedisCache
+from src.services.audio_loader import AudioLoader
+from src.storage.minio_client import get_storage
+from src.cache.redis_client import get_cache
+from src.tasks.artifacts import load_stem, get_grain_store
 from src.db.repositories import ProjectRepository, StyleSoundRepository
-import librosa
+from src.tasks.progress import ProgressReporter
+from src.services.waveform import waveform_peaks
+from minio.error import S3Error
+import json
+import os
 import tempfile
-import asyncio
+import numpy as np
+from src.tasks.runtime import run_async
 
+# Pitch/peak window used for cached analysis (matches the default grain)
+ANALYSIS_WINDOW_MS = 120
 
-async def _analyze_stems_async(project_id: str):
-    """Async helper to analyze stems."""
-    storage = MinIOClient()
-    cache = RedisCache()
-    repo = ProjectRepository()
+ANALYZED_STEMS = ["drums", "bass", "other"]
+
+# (min, max) pairs per waveform in the preview
+WAVEFORM_BUCKETS = 2000
+
+WAVEFORM_STEMS = ["vocals", "drums", "bass", "other"]
+
+# Relative duration of each stage, used for progress percent and ETA
+GRAIN_LIBRARY_STAGES = {"download": 0.2, "build": 0.7, "cache": 0.1}
+
+
+def analyze_stem_audio(audio, window_ms: int = ANALYSIS_WINDOW_MS) -> dict:
+    """
+    Onsets plus per-onset pitch/peak table of a stem.
+
+    This is the structure cached per stem under analysis_cache_key()
+    and consumed by GranularSynthesizer.synthesize(onset_table=...).
+    """
+    onsets = OnsetDetector().detect(audio)
+    pitch_data = PitchAnalyzer().analyze_at_onsets(
+        audio,
+        onsets["samples"],
+        window_ms=window_ms
+    )
+
+    return {
+        "onsets": onsets,
+        "pitch_data": pitch_data,
+        "window_ms": window_ms
+    }
 
-    project = await repo.get_by_id(project_id)
 
-    onset_detector = OnsetDetector()
-    pitch_analyzer = PitchAnalyzer()
+def analysis_cache_key(project) -> str:
+    """
+    Redis key of a project's stem analysis.
 
-    analysis_results = {}
+    Keyed by content when the stems are (stems/{model}/{sha256}/), so
+    identical uploads share one analysis.
+    """
+    if project.base_file_hash and project.demucs_model:
+        return f"analysis:{project.demucs_model}:{project.base_file_hash}"
+    return f"analysis:{project.id}"
 
-    for stem_name in ["drums", "bass", "other"]:
-        stem_path = getattr(project, f"{stem_name}_path")
-        if not stem_path:
-            continue
 
-        with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
-            storage.download(stem_path, tmp.name)
-            audio, sr = librosa.load(tmp.name, sr=44100)
+async def _analyze_stems_async(project_id: str):
+    """Async helper to analyze stems."""
+    cache = get_cache()
+    repo = ProjectRepository()
 
-        # Detect onsets
-        onsets = onset_detector.detect(audio)
+    project = await repo.get_by_id(project_id)
+    cache_key = analysis_cache_key(project)
 
-        # Analyze pitch at each onset
-        pitch_data = pitch_analyzer.analyze_at_onsets(
-            audio,
-            onsets["samples"]
+    # Stems already analyzed (identical upload, or a retry) are kept
+    cached = cache.get_json(cache_key) or {}
+    stem_names = [
+        stem_name for stem_name in ANALYZED_STEMS
+        if getattr(project, f"{stem_name}_path")
+        and (
+            stem_name not in cached
+            or cached[stem_name].get("window_ms", ANALYSIS_WINDOW_MS)
+            != ANALYSIS_WINDOW_MS
         )
+    ]
+    progress = ProgressReporter(
+        f"project:{project_id}",
+        "analysis",
+        {stem_name: 1.0 for stem_name in stem_names}
+    )
+    await repo.update_stage(project_id, "analyze", "running", stems=stem_names)
+
+    try:
+        for stem_name in stem_names:
+            with progress.stage(stem_name):
+                # Memory-mapped from the local artifact cache, which the
+                # separation seeded when it ran on this host
+                audio = load_stem(getattr(project, f"{stem_name}_path"))
 
-        analysis_results[stem_name] = {
-            "onsets": onsets,
-            "pitch_data": pitch_data
-        }
+                # Detect onsets and analyze pitch at each onset; merged so
+                # entries for other windows (added by mixes) are kept
+                cache.merge_json(
+                    cache_key,
+                    {stem_name: analyze_stem_audio(audio)}
+                )
 
-    # Cache result
-    cache_key = f"analysis:{project_id}"
-    cache.set_json(cache_key, analysis_results)
+        await repo.update(project_id, {"analysis_cache_key": cache_key})
 
-    await repo.update(project_id, {"analysis_cache_key": cache_key})
+    except Exception as e:
+        await repo.update_stage(project_id, "analyze", "error", error=str(e))
+        progress.fail(e)
+        raise e
 
+    await repo.update_stage(
+        project_id,
+        "analyze",
+        "complete",
+        cache_key=cache_key,
+        analyzed=stem_names
+    )
+    progress.complete(cache_key=cache_key, analyzed=stem_names)
     return {"status": "success", "cache_key": cache_key}
 
 
-@celery_app.task(name="tasks.analyze_stems")
+def _analysis_given_up(task, exc, project_id: str):
+    run_async(ProjectRepository().update_stage(
+        project_id,
+        "analyze",
+        "error",
+        error=str(exc)
+    ))
+    ProgressReporter(f"project:{project_id}", "analysis", {}).fail(exc)
+
+
+@celery_app.task(name="tasks.analyze_stems", on_give_up=_analysis_given_up)
 def analyze_stems(project_id: str):
     """Analyze onsets and pitch of each stem."""
-    # Run async code in a single event loop
-    return asyncio.run(_analyze_stems_async(project_id))
+    # Run on the worker's long-lived event loop
+    return run_async(_analyze_stems_async(project_id))
+
+
+def waveform_path(project) -> str:
+    """Storage path of a project's waveform preview, next to its stems."""
+    return f"{os.path.dirname(project.vocals_path)}/waveform.json"
+
+
+async def _build_waveform_async(project_id: str):
+    """Async helper to build the waveform preview."""
+    storage = get_storage()
+    repo = ProjectRepository()
+
+    project = await repo.get_by_id(project_id)
+    path = waveform_path(project)
+    await repo.update_stage(project_id, "preview", "running")
+
+    try:
+        # Shared by identical uploads, like the stems it is drawn from
+        try:
+            storage.stat(path)
+            exists = True
+        except S3Error as e:
+            if e.code != "NoSuchKey":
+                raise
+            exists = False
+
+        if not exists:
+            waveforms = {}
+            mix = None
+            for stem_name in WAVEFORM_STEMS:
+                audio = load_stem(getattr(project, f"{stem_name}_path"))
+                waveforms[stem_name] = waveform_peaks(audio, WAVEFORM_BUCKETS)
+                if mix is None:
+                    mix = np.array(audio, dtype=np.float32)
+                else:
+                    mix = mix + audio
+            waveforms["mix"] = waveform_peaks(mix, WAVEFORM_BUCKETS)
+
+            storage.upload_bytes(json.dumps({
+                "buckets": WAVEFORM_BUCKETS,
+                "duration_seconds": len(mix) / 44100,
+                "waveforms": waveforms
+            }).encode(), path)
+
+    except Exception as e:
+        await repo.update_stage(project_id, "preview", "error", error=str(e))
+        raise e
+
+    await repo.update_stage(project_id, "preview", "complete", path=path)
+    return {"status": "success", "path": path}
+
+
+def _waveform_given_up(task, exc, project_id: str):
+    run_async(ProjectRepository().update_stage(
+        project_id,
+        "preview",
+        "error",
+        error=str(exc)
+    ))
+
+
+@celery_app.task(name="tasks.build_waveform", on_give_up=_waveform_given_up)
+def build_waveform(project_id: str):
+    """Min/max waveform of the mix and each stem, for the project page."""
+    # Run on the worker's long-lived event loop
+    return run_async(_build_waveform_async(project_id))
 
 
 async def _build_grain_library_async(style_sound_id: str):
     """Async helper to build grain library."""
-    storage = MinIOClient()
-    cache = RedisCache()
+    storage = get_storage()
+    store = get_grain_store()
     repo = StyleSoundRepository()
 
     style = await repo.get_by_id(style_sound_id)
+    progress = ProgressReporter(
+        f"style:{style_sound_id}",
+        "grain_library",
+        GRAIN_LIBRARY_STAGES
+    )
+    cache_key = store.redis_key(style_sound_id)
 
     builder = GrainBuilder()
 
-    with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
-        storage.download(style.file_path, tmp.name)
-        audio, sr = librosa.load(tmp.name, sr=44100)
+    try:
+        # One build per style at a time; a caller that waited here finds
+        # the library built by the lock holder
+        with store.build_lock(style_sound_id):
+            grains = store.get(style_sound_id, count=False)
+            if grains is not None:
+                progress.skip("download", "build", "cache")
+                progress.complete(
+                    cache_key=cache_key,
+                    grain_count=len(grains),
+                    built=False
+                )
+                return {
+                    "status": "success",
+                    "cache_key": cache_key,
+                    "grain_count": len(grains)
+                }
+
+            with progress.stage("download"):
+                with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+                    storage.download(style.file_path, tmp.name)
+                    audio, sr = AudioLoader.load(tmp.name, sample_rate=44100)
+
+            # Build grain library
+            with progress.stage("build"):
+                grains = builder.build_library(audio)
 
-    # Build grain library
-    grains = builder.build_library(audio)
+            # Calculate duration
+            duration = len(audio) / sr
 
-    # Calculate duration
-    duration = len(audio) / sr
+            with progress.stage("cache"):
+                # Storage (durable), Redis and this process
+                store.put(style_sound_id, grains)
 
-    # Cache grains
-    cache_key = f"grains:{style_sound_id}"
-    cache.set_grains(cache_key, grains)
+                # Update database
+                await repo.update(style_sound_id, {
+                    "grain_cache_key": cache_key,
+                    "grain_count": len(grains),
+                    "duration_seconds": duration
+                })
 
-    # Update database
-    await repo.update(style_sound_id, {
-        "grain_cache_key": cache_key,
-        "grain_count": len(grains),
-        "duration_seconds": duration
-    })
+    except Exception as e:
+        progress.fail(e)
+        raise e
 
+    progress.complete(cache_key=cache_key, grain_count=len(grains), built=True)
     return {
         "status": "success",
         "cache_key": cache_key,
@@ -101,8 +274,19 @@ async def _build_grain_library_async(style_sound_id: str):
     }
 
 
-@celery_app.task(name="tasks.build_grain_library")
+def _grain_library_given_up(task, exc, style_sound_id: str):
+    ProgressReporter(
+        f"style:{style_sound_id}",
+        "grain_library",
+        GRAIN_LIBRARY_STAGES
+    ).fail(exc)
+
+
+@celery_app.task(
+    name="tasks.build_grain_library",
+    on_give_up=_grain_library_given_up
+)
 def build_grain_library(style_sound_id: str):
     """Build grain library from style sound file."""
-    # Run async code in a single event loop
-    return asyncio.run(_build_grain_library_async(style_sound_id))
+    # Run on the worker's long-lived event loop
+    return run_async(_build_grain_library_async(style_sound_id))
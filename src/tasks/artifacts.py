@@ -0,0 +1,78 @@
+# src/tasks/artifacts.py
+import tempfile
+import numpy as np
+from typing import Optional
+from minio.error import S3Error
+from src.services.audio_loader import AudioLoader, processing_dtype
+from src.storage.artifact_cache import LocalArtifactCache, stem_artifact_path
+from src.storage.render_cache import RenderCache
+from src.storage.grain_store import GrainLibraryStore
+from src.storage.minio_client import get_storage
+from src.cache.redis_client import get_cache
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+_artifact_cache: Optional[LocalArtifactCache] = None
+_render_cache: Optional[RenderCache] = None
+_grain_store: Optional[GrainLibraryStore] = None
+
+
+def get_artifact_cache() -> LocalArtifactCache:
+    """Worker-wide local artifact cache."""
+    global _artifact_cache
+    if _artifact_cache is None:
+        _artifact_cache = LocalArtifactCache(
+            get_storage(),
+            settings.ARTIFACT_CACHE_DIR,
+            settings.ARTIFACT_CACHE_MAX_MB * 1024 * 1024
+        )
+    return _artifact_cache
+
+
+def get_render_cache() -> RenderCache:
+    """Worker-wide handle on the shared render cache."""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache(
+            get_storage(),
+            get_cache(),
+            settings.RENDER_CACHE_MAX_MB * 1024 * 1024
+        )
+    return _render_cache
+
+
+def get_grain_store() -> GrainLibraryStore:
+    """Process-wide tiered grain library cache."""
+    global _grain_store
+    if _grain_store is None:
+        _grain_store = GrainLibraryStore(
+            get_storage(),
+            get_cache(),
+            max_local=settings.GRAIN_LRU_SIZE,
+            max_bank_bytes=settings.GRAIN_BANKS_MAX_MB * 1024 * 1024
+        )
+    return _grain_store
+
+
+def load_stem(stem_path: str, sample_rate: int = 44100) -> np.ndarray:
+    """
+    Mono stem audio for processing.
+
+    Uses the decoded float32 artifact published at separation time
+    (memory-mapped from the local cache); stems separated before those
+    artifacts existed fall back to downloading and decoding the WAV.
+    """
+    cache = get_artifact_cache()
+
+    try:
+        audio = cache.open_array(stem_artifact_path(stem_path))
+    except S3Error as e:
+        if e.code != "NoSuchKey":
+            raise
+        with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+            cache.storage.download(stem_path, tmp.name)
+            audio, _ = AudioLoader.load(tmp.name, sample_rate=sample_rate)
+        return audio
+
+    return audio.astype(processing_dtype(), copy=False)
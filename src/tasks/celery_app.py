@@ -1,11 +1,123 @@
 # src/tasks/celery_app.py
-from celery import Celery
+from celery import Celery, Task
+from kombu import Exchange, Queue
+from celery.signals import worker_process_init, worker_process_shutdown
 from src.config.settings import get_settings
 
 settings = get_settings()
 
+
+class DeliveryLimitExceeded(Exception):
+    """Raised when a task message exceeds TASK_MAX_DELIVERIES deliveries."""
+
+
+class ResumableTask(Task):
+    """
+    Task acknowledged only after it finishes.
+
+    A message whose worker dies mid-task (OOM, hard time limit, crash) is
+    redelivered, possibly to another worker, which resumes from the
+    checkpoints on the Project/Mix row instead of starting over. A message
+    that keeps killing its worker is given up after TASK_MAX_DELIVERIES,
+    and its on_give_up handler records the failure.
+    """
+
+    acks_late = True
+    reject_on_worker_lost = True
+
+    def __call__(self, *args, **kwargs):
+        # Direct calls (e.g. the serial mix path) run inside the caller
+        if self.request.id and not self.request.is_eager:
+            from src.cache.redis_client import get_cache
+
+            # Per attempt: a retry is a new message under the same task id
+            deliveries = get_cache().incr(
+                f"deliveries:{self.request.id}:{self.request.retries}"
+            )
+            if deliveries > settings.TASK_MAX_DELIVERIES:
+                raise DeliveryLimitExceeded(
+                    f"{self.name} delivered {deliveries} times, giving up"
+                )
+        return super().__call__(*args, **kwargs)
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """Record a task given up after too many deliveries."""
+        # Its body never ran, so neither did its own error handling
+        if isinstance(exc, DeliveryLimitExceeded):
+            self.on_give_up(exc, *args, **kwargs)
+
+    def on_give_up(self, exc: DeliveryLimitExceeded, *args, **kwargs):
+        """
+        Mark the task's job as failed (status, stage, progress event).
+
+        Set per task with ``@celery_app.task(on_give_up=handler)``; the
+        handler gets the task, the exception and the task's arguments.
+        """
+
+
+# Dedicated queues, so each worker image consumes only the work it is
+# sized for: a backlog of multi-minute separations no longer holds up
+# analysis or interactive mix renders.
+#   separation: Demucs (worker-gpu)
+#   analysis:   stem analysis, waveform previews, chunk stitching
+#   synthesis:  mix renders and grain library builds
+# Each queue has its own exchange and routing key: left unset, they
+# default to task_default_queue's and every queue would get every message.
+TASK_QUEUES = [
+    Queue(name, Exchange(name), routing_key=name)
+    for name in ("separation", "analysis", "synthesis")
+]
+
+# Message priorities. With the Redis broker 0 is consumed first and only
+# the transport's priority_steps (0, 3, 6, 9) are distinct levels.
+PRIORITY_INTERACTIVE = 0  # A user is waiting on the result (mixes)
+PRIORITY_DEFAULT = 3  # Pipeline stages, grain library builds
+PRIORITY_BATCH = 6  # Long-running bulk work (separation)
+
+TASK_ROUTES = {
+    "tasks.separate_stems": {
+        "queue": "separation",
+        "priority": PRIORITY_BATCH,
+    },
+    # Ahead of new separations: a job's chunks hold its lock, and they
+    # must not starve behind separations waiting for it
+    "tasks.separate_chunk": {
+        "queue": "separation",
+        "priority": PRIORITY_DEFAULT,
+    },
+    "tasks.stitch_stems": {
+        "queue": "analysis",
+        "priority": PRIORITY_DEFAULT,
+    },
+    "tasks.analyze_stems": {
+        "queue": "analysis",
+        "priority": PRIORITY_DEFAULT,
+    },
+    "tasks.build_waveform": {
+        "queue": "analysis",
+        "priority": PRIORITY_DEFAULT,
+    },
+    "tasks.build_grain_library": {
+        "queue": "synthesis",
+        "priority": PRIORITY_DEFAULT,
+    },
+    "tasks.create_mix": {
+        "queue": "synthesis",
+        "priority": PRIORITY_INTERACTIVE,
+    },
+    "tasks.render_stem": {
+        "queue": "synthesis",
+        "priority": PRIORITY_INTERACTIVE,
+    },
+    "tasks.finalize_mix": {
+        "queue": "synthesis",
+        "priority": PRIORITY_INTERACTIVE,
+    },
+}
+
 celery_app = Celery(
     "audio_mixer",
+    task_cls=ResumableTask,
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
     include=[
@@ -21,4 +133,57 @@ celery_app.conf.update(
     result_serializer='pickle',
     task_track_started=True,
     task_time_limit=900,  # 15 min max
+    # Ack after the task ends; a worker lost mid-task requeues it
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Unacked messages are redelivered after this: keep it above the
+    # longest task, or a running task would start again elsewhere
+    broker_transport_options={"visibility_timeout": 3600},
+    # Reserve one message at a time, so a redelivery isn't stuck behind
+    # a busy worker's prefetched backlog (and a high-priority message
+    # behind prefetched low-priority ones); workers of short, uniform
+    # queues raise it with --prefetch-multiplier
+    worker_prefetch_multiplier=1,
+    # Routing: each task goes to its queue with its priority (an explicit
+    # apply_async(queue=..., priority=...) still wins)
+    task_queues=TASK_QUEUES,
+    task_routes=TASK_ROUTES,
+    task_default_queue="analysis",
+    task_default_priority=PRIORITY_DEFAULT,
 )
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Per-process setup after the worker forks."""
+    from src.cache.redis_client import close_cache, get_cache
+    from src.db.database import engine
+    from src.storage.minio_client import close_storage, get_storage
+    from src.tasks.runtime import reset_loop
+
+    # Never reuse connections (or an event loop) inherited from the parent
+    engine.sync_engine.dispose(close=False)
+    reset_loop()
+    close_cache()
+    close_storage()
+
+    # Shared clients for every task this process runs
+    get_storage()
+    get_cache()
+
+    if settings.DEMUCS_PRELOAD:
+        # Warm Demucs model for every separation this process runs
+        from src.services.stem_separator import get_separation_engine
+        get_separation_engine()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Release shared clients when a worker process exits."""
+    from src.cache.redis_client import close_cache
+    from src.storage.minio_client import close_storage
+    from src.tasks.runtime import close_loop
+
+    close_loop()
+    close_cache()
+    close_storage()
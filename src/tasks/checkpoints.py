@@ -0,0 +1,38 @@
+# src/tasks/checkpoints.py
+from typing import Optional
+from minio.error import S3Error
+from src.storage.minio_client import MinIOClient
+
+
+def checkpoint(path: str, etag: str, **detail) -> dict:
+    """Checkpoint entry of an uploaded artifact (etag is the content hash)."""
+    return {"path": path, "etag": etag.strip('"'), **detail}
+
+
+def is_valid(storage: MinIOClient, entry: Optional[dict]) -> bool:
+    """True if a checkpointed artifact is still in storage, unchanged."""
+    if not entry:
+        return False
+    try:
+        return storage.stat(entry["path"]).etag.strip('"') == entry["etag"]
+    except S3Error as e:
+        if e.code != "NoSuchKey":
+            raise
+        return False
+
+
+def valid_checkpoints(
+    storage: MinIOClient,
+    checkpoints: Optional[dict],
+    names: list[str]
+) -> Optional[dict]:
+    """
+    Entries of the given checkpoints if every one of them is valid.
+
+    Returns:
+        Dict of name to entry, or None if any is missing or stale
+    """
+    checkpoints = checkpoints or {}
+    if not all(is_valid(storage, checkpoints.get(name)) for name in names):
+        return None
+    return {name: checkpoints[name] for name in names}
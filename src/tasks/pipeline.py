@@ -0,0 +1,42 @@
+# src/tasks/pipeline.py
+from celery import chain
+from celery.canvas import Signature
+from src.tasks.separation import separate_stems
+from src.tasks.analysis import analyze_stems, build_waveform
+from src.config.settings import get_settings
+
+settings = get_settings()
+
+# Stages of a project, in order, and the task running each one
+PROJECT_PIPELINE = {
+    "separate": separate_stems,
+    "analyze": analyze_stems,
+    "preview": build_waveform,
+}
+
+
+def project_stages(skip: tuple[str, ...] = ()) -> list[str]:
+    """Stages a new project goes through (preview only if enabled)."""
+    return [
+        stage for stage in PROJECT_PIPELINE
+        if stage not in skip
+        and (stage != "preview" or settings.PIPELINE_PREVIEW)
+    ]
+
+
+def pending_stages(stages: list[str]) -> dict:
+    """Initial ``Project.stages`` for a pipeline."""
+    return {stage: {"status": "pending"} for stage in stages}
+
+
+def project_pipeline(project_id: str, stages: list[str]) -> Signature:
+    """
+    Celery chain running a project's stages in order.
+
+    Each stage is an immutable signature (it loads what it needs from the
+    project, not from the previous result) and records its status in
+    ``Project.stages``; a failing stage stops the chain. Stems published
+    by the separation are seeded into the worker's local artifact cache,
+    so later stages on the same host read them without a download.
+    """
+    return chain(*(PROJECT_PIPELINE[stage].si(project_id) for stage in stages))
@@ -0,0 +1,184 @@
+# src/tasks/progress.py
+import time
+from contextlib import contextmanager
+from typing import Optional
+from src.cache.redis_client import get_cache
+
+# Seconds the last event of a channel is kept for late subscribers
+PROGRESS_TTL = 3600
+
+
+def progress_key(channel: str) -> str:
+    """Redis key holding the last progress event of a channel."""
+    return f"progress:{channel}"
+
+
+class ProgressReporter:
+    """
+    Publishes progress events of one job on a Redis pub/sub channel.
+
+    A job is a fixed sequence of weighted stages. Every event carries the
+    current stage, overall and stage percent, the duration of each
+    finished stage and an ETA extrapolated from the elapsed time. The last
+    event is also stored under ``progress:{channel}`` so a client that
+    connects mid-job gets the current state without querying the database,
+    and so a job spread over several tasks can be resumed (see resume()).
+
+    Event format:
+        {
+            "type": "progress",
+            "channel": "mix:<id>",
+            "job": "mix",
+            "status": "running" | "complete" | "error",
+            "stage": "render",
+            "stage_index": 1,
+            "stage_count": 3,
+            "stage_percent": 40.0,
+            "percent": 52.5,
+            "started_at": 1699999987.7,
+            "stage_started_at": 1699999995.0,
+            "elapsed": 12.3,
+            "eta": 11.1,
+            "timings": {"download": 0.8},
+            "detail": {...},
+            "timestamp": 1700000000.0
+        }
+    """
+
+    def __init__(self, channel: str, job: str, stages: dict[str, float]):
+        """
+        Args:
+            channel: Pub/sub channel (project:<id>, mix:<id> or style:<id>)
+            job: Job name, distinguishes jobs sharing a channel
+            stages: Ordered stage names mapped to their relative weight
+        """
+        self.channel = channel
+        self.job = job
+        self.stages = list(stages)
+        total = sum(stages.values()) or 1.0
+        self.weights = {
+            name: weight / total for name, weight in stages.items()
+        }
+
+        # Wall clock, so tasks in other processes can resume the job
+        self.started_at = time.time()
+        self.timings: dict[str, float] = {}
+        self.stage_name: Optional[str] = None
+        self.stage_started_at = self.started_at
+        self.cache = get_cache()
+
+    @classmethod
+    def resume(
+        cls,
+        channel: str,
+        job: str,
+        stages: dict[str, float]
+    ) -> "ProgressReporter":
+        """Reporter continuing a running job started by another task."""
+        reporter = cls(channel, job, stages)
+        last = reporter.cache.get_json(progress_key(channel))
+        if last and last.get("job") == job and last.get("status") == "running":
+            reporter.started_at = last["started_at"]
+            reporter.stage_started_at = last["stage_started_at"]
+            reporter.stage_name = last["stage"]
+            reporter.timings = dict(last["timings"])
+        return reporter
+
+    def _done_fraction(self) -> float:
+        return sum(self.weights[name] for name in self.timings)
+
+    def _emit(
+        self,
+        status: str,
+        stage_fraction: float = 0.0,
+        detail: dict = None,
+        error: str = None
+    ):
+        now = time.time()
+        elapsed = now - self.started_at
+
+        fraction = self._done_fraction()
+        if status == "complete":
+            fraction = 1.0
+        elif (
+            self.stage_name is not None
+            and self.stage_name not in self.timings
+        ):
+            fraction += self.weights[self.stage_name] * stage_fraction
+        fraction = min(fraction, 1.0)
+
+        eta = None
+        if status == "running" and fraction > 0:
+            eta = round(elapsed / fraction - elapsed, 2)
+        elif status == "complete":
+            eta = 0.0
+
+        event = {
+            "type": "progress",
+            "channel": self.channel,
+            "job": self.job,
+            "status": status,
+            "stage": self.stage_name,
+            "stage_index": (
+                self.stages.index(self.stage_name)
+                if self.stage_name else None
+            ),
+            "stage_count": len(self.stages),
+            "stage_percent": round(stage_fraction * 100, 1),
+            "percent": round(fraction * 100, 1),
+            "started_at": self.started_at,
+            "stage_started_at": self.stage_started_at,
+            "elapsed": round(elapsed, 2),
+            "eta": eta,
+            "timings": dict(self.timings),
+            "detail": detail or {},
+            "timestamp": now,
+        }
+        if error is not None:
+            event["error"] = error
+
+        self.cache.set_json(
+            progress_key(self.channel),
+            event,
+            ttl=PROGRESS_TTL
+        )
+        self.cache.publish(self.channel, event)
+        return event
+
+    @contextmanager
+    def stage(self, name: str, **detail):
+        """Run a block as one stage, emitting on entry and timing it."""
+        self.stage_name = name
+        self.stage_started_at = time.time()
+        self._emit("running", 0.0, detail)
+        yield self
+        self.end_stage()
+
+    def start_stage(self, name: str, **detail):
+        """Enter a stage that is finished by a later task (see end_stage())."""
+        self.stage_name = name
+        self.stage_started_at = time.time()
+        self._emit("running", 0.0, detail)
+
+    def end_stage(self):
+        """Record the duration of the current stage."""
+        if self.stage_name is not None:
+            duration = time.time() - self.stage_started_at
+            self.timings[self.stage_name] = round(duration, 3)
+
+    def update(self, stage_fraction: float, **detail):
+        """Report progress within the current stage (0..1)."""
+        self._emit("running", max(0.0, min(stage_fraction, 1.0)), detail)
+
+    def skip(self, *names: str):
+        """Mark stages that will not run as done (zero duration)."""
+        for name in names:
+            self.timings.setdefault(name, 0.0)
+
+    def complete(self, **detail):
+        """Emit the final event of a successful job."""
+        return self._emit("complete", 1.0, detail)
+
+    def fail(self, error: Exception | str, **detail):
+        """Emit the final event of a failed job."""
+        return self._emit("error", 0.0, detail, error=str(error))
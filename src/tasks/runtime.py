@@ -0,0 +1,42 @@
+# src/tasks/runtime.py
+import asyncio
+from typing import Any, Coroutine, Optional
+
+# One long-lived event loop per worker process. The async DB engine's
+# pooled connections are bound to the loop they were opened on, so
+# running every task coroutine here lets them be reused across calls
+# and tasks instead of reconnecting on each asyncio.run().
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The worker process event loop, created on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Coroutine) -> Any:
+    """Run a coroutine to completion on the worker loop."""
+    return get_loop().run_until_complete(coro)
+
+
+def reset_loop():
+    """Forget the loop (e.g. one inherited from the parent after fork)."""
+    global _loop
+    _loop = None
+
+
+def close_loop():
+    """Dispose the engine's connections and close the loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+
+    from src.db.database import engine
+
+    _loop.run_until_complete(engine.dispose())
+    _loop.close()
+    _loop = None
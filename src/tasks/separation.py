@@ -1,54 +1,640 @@
 # src/tasks/separation.py - VERSÃO CORRIGIDA
+from celery import chord
+from celery.canvas import Signature
 from src.tasks.celery_app import celery_app
-from src.services.stem_separator import StemSeparator
-from src.storage.minio_client import MinIOClient
+from src.services.stem_separator import (
+    StemSeparator,
+    chunk_bounds,
+    normalization_stats,
+    stitch_chunks
+)
+from src.services.audio_loader import AudioLoader
+from src.storage.artifact_cache import stem_artifact_path
+from src.tasks.artifacts import get_artifact_cache
+from src.tasks.checkpoints import checkpoint, is_valid, valid_checkpoints
+from src.storage.minio_client import get_storage
+from src.cache.redis_client import get_cache
 from src.db.repositories import ProjectRepository
+from src.tasks.progress import ProgressReporter, progress_key
+from src.config.settings import get_settings
+from redis.exceptions import LockError
+import librosa
+import numpy as np
 import tempfile
 import os
-import asyncio
+from src.tasks.runtime import run_async
 
+settings = get_settings()
 
-async def _separate_stems_async(project_id: str):
-    """Async helper to separate stems."""
-    storage = MinIOClient()
+# Seconds a separation may hold the per-content lock
+SEPARATION_LOCK_TIMEOUT = 900
+
+# Seconds before a separation finding the lock held tries again
+SEPARATION_LOCK_RETRY = 15
+
+SEPARATED_STEMS = ["vocals", "drums", "bass", "other"]
+
+# Relative duration of each stage, used for progress percent and ETA
+SEPARATION_STAGES = {
+    "queue": 0.02,
+    "download": 0.05,
+    "separate": 0.8,
+    "upload": 0.13,
+}
+
+
+def stems_prefix(file_hash: str, model: str) -> str:
+    """Content-addressed storage prefix shared by identical uploads."""
+    return f"stems/{model}/{file_hash}/"
+
+
+def chunks_prefix(project_id: str) -> str:
+    """Storage prefix of a chunked separation's intermediate arrays."""
+    return f"separation/{project_id}/"
+
+
+def _separation_progress(
+    project_id: str,
+    resume: bool = False
+) -> ProgressReporter:
+    """Progress reporter of a separation (shared by the tasks of its chord)."""
+    reporter = ProgressReporter.resume if resume else ProgressReporter
+    return reporter(f"project:{project_id}", "separation", SEPARATION_STAGES)
+
+
+def _separated_key(project_id: str) -> str:
+    """Counter of separated chunks of a project."""
+    return f"{progress_key(f'project:{project_id}')}:chunks"
+
+
+def _separation_lock(model: str, file_hash: str, token: bytes = None):
+    """
+    Single-flight lock per (content, model).
+
+    With ``token``, the lock taken by another task of the same separation
+    (chunk tasks extend it, the stitch task releases it).
+    """
+    lock = get_cache().lock(
+        f"lock:separation:{model}:{file_hash}",
+        timeout=SEPARATION_LOCK_TIMEOUT
+    )
+    if token is not None:
+        lock.local.token = token
+    return lock
+
+
+class SeparationInFlight(Exception):
+    """The same content is being separated by another task (lock held)."""
+
+
+def _release(lock):
+    try:
+        lock.release()
+    except LockError:
+        pass  # Expired, or already released by a failed chunk
+
+
+def _extend(lock):
+    try:
+        lock.reacquire()
+    except LockError:
+        pass  # Expired: at worst an identical upload separates again
+
+
+def _fail_separation(project_id: str, error: Exception, **detail):
+    """Record a failed separation on the project and its progress."""
+    repo = ProjectRepository()
+    run_async(repo.update_status(project_id, "error"))
+    run_async(repo.update_stage(
+        project_id,
+        "separate",
+        "error",
+        error=str(error),
+        **detail
+    ))
+    _separation_progress(project_id, resume=True).fail(error, **detail)
+
+
+def _separation_given_up(task, exc, project_id: str):
+    _fail_separation(project_id, exc)
+
+
+def _chunk_given_up(
+    task,
+    exc,
+    project_id: str,
+    index: int,
+    *args,
+    file_hash: str,
+    model: str,
+    token: bytes,
+    **kwargs
+):
+    _release(_separation_lock(model, file_hash, token))
+    _fail_separation(project_id, exc, chunk=index)
+
+
+def _stitch_given_up(
+    task,
+    exc,
+    chunks: list[dict],
+    project_id: str,
+    *args,
+    file_hash: str,
+    model: str,
+    token: bytes,
+    **kwargs
+):
+    _release(_separation_lock(model, file_hash, token))
+    _fail_separation(project_id, exc)
+
+
+def _publish_stems(
+    file_hash: str,
+    model: str,
+    stems: dict,
+    sample_rate: int,
+    progress: ProgressReporter
+) -> tuple[dict[str, str], dict]:
+    """
+    Upload separated stems (encoded in memory, no intermediate files).
+
+    The decoded artifacts are also seeded into this host's artifact
+    cache under the etag just returned by storage, so the next stages
+    (analysis, preview) read them locally when they run here.
+
+    Returns:
+        Dict of stem name to storage path of its WAV, and the checkpoints
+        (``stem:{name}``, ``stem:{name}:f32``) of everything uploaded
+    """
+    storage = get_storage()
+    prefix = stems_prefix(file_hash, model)
+    stem_paths, checkpoints = {}, {}
+    for i, (stem_name, audio) in enumerate(stems.items()):
+        remote_path = f"{prefix}{stem_name}.wav"
+        etag = storage.upload_bytes(
+            AudioLoader.to_wav_bytes(audio, sample_rate),
+            remote_path
+        )
+        stem_paths[stem_name] = remote_path
+        checkpoints[f"stem:{stem_name}"] = checkpoint(remote_path, etag)
+
+        # Decoded mono float32 at 44.1 kHz, so workers can memory-map
+        # it instead of decoding the WAV
+        mono = np.mean(audio, axis=1, dtype=np.float32)
+        if sample_rate != 44100:
+            mono = librosa.resample(mono, orig_sr=sample_rate, target_sr=44100)
+        artifact_path = stem_artifact_path(remote_path)
+        etag = storage.upload_array(mono, artifact_path)
+        get_artifact_cache().put_array(artifact_path, etag, mono)
+        checkpoints[f"stem:{stem_name}:f32"] = checkpoint(artifact_path, etag)
+        progress.update((i + 1) / len(stems), stem=stem_name)
+    return stem_paths, checkpoints
+
+
+def _published_stems(checkpoints: dict) -> dict[str, str] | None:
+    """Stem paths checkpointed by an earlier attempt, if all still valid."""
+    names = [
+        f"stem:{stem_name}{suffix}"
+        for stem_name in SEPARATED_STEMS
+        for suffix in ("", ":f32")
+    ]
+    entries = valid_checkpoints(get_storage(), checkpoints, names)
+    if entries is None:
+        return None
+    return {
+        stem_name: entries[f"stem:{stem_name}"]["path"]
+        for stem_name in SEPARATED_STEMS
+    }
+
+
+def _finished_chunk(
+    checkpoints: dict,
+    index: int,
+    start: int,
+    end: int
+) -> dict | None:
+    """Chunk separated by an earlier attempt (same range), if still valid."""
+    entry = (checkpoints or {}).get(f"chunk:{index}")
+    if not entry or (entry["start"], entry["end"]) != (start, end):
+        return None
+    storage = get_storage()
+    if not all(is_valid(storage, stem) for stem in entry["stems"].values()):
+        return None
+    return {
+        "index": index,
+        "stems": {name: stem["path"] for name, stem in entry["stems"].items()}
+    }
+
+
+def _chunked_separation(
+    project_id: str,
+    file_hash: str,
+    model: str,
+    wav: np.ndarray,
+    sample_rate: int,
+    bounds: list[tuple[int, int]],
+    token: bytes,
+    checkpoints: dict
+) -> Signature:
+    """
+    Upload the chunks of a long track and build the chord separating them.
+
+    Each chunk is separated by its own separate_chunk task (normalized
+    with the whole track's stats); stitch_stems crossfades the results.
+    Chunks checkpointed by an earlier attempt are passed to stitch_stems
+    as they are.
+    """
+    storage = get_storage()
+    prefix = chunks_prefix(project_id)
+    stats = normalization_stats(wav)
+
+    header, done = [], []
+    for index, (start, end) in enumerate(bounds):
+        finished = _finished_chunk(checkpoints, index, start, end)
+        if finished:
+            done.append(finished)
+            continue
+
+        input_path = f"{prefix}input/{index}.npy"
+        storage.upload_array(
+            np.ascontiguousarray(wav[:, start:end]),
+            input_path
+        )
+        header.append(separate_chunk.s(
+            project_id,
+            index,
+            input_path,
+            start=start,
+            end=end,
+            file_hash=file_hash,
+            model=model,
+            stats=stats,
+            token=token,
+            count=len(bounds)
+        ))
+
+    stitch = stitch_stems.s(
+        project_id,
+        bounds=bounds,
+        file_hash=file_hash,
+        model=model,
+        token=token,
+        sample_rate=sample_rate,
+        done=done
+    )
+    if done:
+        get_cache().incr(_separated_key(project_id), amount=len(done))
+    if not header:
+        return stitch.clone(args=([],))
+    return chord(header, stitch)
+
+
+async def _separate_stems_async(project_id: str, waiting: bool = False):
+    """
+    Async helper to separate stems.
+
+    Args:
+        project_id: Project to separate
+        waiting: True on a retry after finding the lock held (the
+            progress of the first attempt continues)
+
+    Returns:
+        Result dict, or the chord to continue with for a long track
+
+    Raises:
+        SeparationInFlight: The lock is held by an in-flight separation
+    """
     repo = ProjectRepository()
     separator = StemSeparator()
+    progress = _separation_progress(project_id, resume=waiting)
+    get_cache().delete(_separated_key(project_id))
 
     # Update status
     await repo.update_status(project_id, "separating")
+    await repo.update_stage(project_id, "separate", "running")
 
     try:
         # Fetch project
         project = await repo.get_by_id(project_id)
+        file_hash = project.base_file_hash
+        model = project.demucs_model or separator.model
+
+        # Single-flight per (content, model): a repeat upload retries
+        # until the in-flight separation is done, then reuses its stems.
+        # Never block here: the holder's chunk tasks may need this slot.
+        lock = _separation_lock(model, file_hash)
+
+        with progress.stage("queue"):
+            if not lock.acquire(blocking=False):
+                raise SeparationInFlight(f"{model}:{file_hash}")
+
+        handed_off = False
+        try:
+            # Re-read after the lock: a previous attempt may have finished
+            checkpoints = (await repo.get_by_id(project_id)).checkpoints or {}
+
+            source = await repo.get_by_separation_key(
+                file_hash, model, exclude_id=project_id, statuses=["ready"]
+            )
+            if source:
+                await repo.update_stems(project_id, {
+                    "vocals": source.vocals_path,
+                    "drums": source.drums_path,
+                    "bass": source.bass_path,
+                    "other": source.other_path,
+                })
+                await repo.update_status(project_id, "ready")
+                await repo.update_stage(
+                    project_id,
+                    "separate",
+                    "complete",
+                    reused_from=str(source.id)
+                )
+                progress.skip("download", "separate", "upload")
+                progress.complete(status="ready", reused_from=str(source.id))
+                return {
+                    "status": "success",
+                    "project_id": project_id,
+                    "reused_from": str(source.id)
+                }
+
+            # Stems published by an earlier attempt (crash before the
+            # project was updated): nothing to separate
+            published = _published_stems(checkpoints)
+            if published:
+                await repo.update_stems(project_id, published)
+                await repo.update_status(project_id, "ready")
+                await repo.update_stage(
+                    project_id,
+                    "separate",
+                    "complete",
+                    resumed=True
+                )
+                progress.skip("download", "separate", "upload")
+                progress.complete(status="ready", resumed=True)
+                return {
+                    "status": "success",
+                    "project_id": project_id,
+                    "resumed": True
+                }
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Download base file
-            local_input = os.path.join(tmpdir, "input.wav")
-            storage.download(project.base_file_path, local_input)
+            with tempfile.TemporaryDirectory() as tmpdir:
+                # Download and decode base file
+                local_input = os.path.join(tmpdir, "input.wav")
+                with progress.stage("download"):
+                    get_storage().download(project.base_file_path, local_input)
+                    wav = separator.load(local_input)
 
-            # Separate stems
-            stems = separator.separate(local_input, tmpdir)
+            sample_rate = separator.sample_rate
+            bounds = chunk_bounds(
+                wav.shape[1],
+                int(settings.DEMUCS_CHUNK_SECONDS * sample_rate),
+                int(settings.DEMUCS_CHUNK_OVERLAP_SECONDS * sample_rate)
+            )
+            if len(bounds) > 1:
+                # Long track: separate chunks in parallel; the lock passes
+                # to the chord, whose stitch task releases it
+                workflow = _chunked_separation(
+                    project_id,
+                    file_hash,
+                    model,
+                    wav,
+                    sample_rate,
+                    bounds,
+                    lock.local.token,
+                    checkpoints
+                )
+                progress.start_stage(
+                    "separate",
+                    model=model,
+                    chunks=len(bounds)
+                )
+                await repo.update_stage(
+                    project_id,
+                    "separate",
+                    "running",
+                    chunks=len(bounds)
+                )
+                handed_off = True
+                return workflow
 
-            # Upload stems
-            stem_paths = {}
-            for stem_name, local_path in stems.items():
-                remote_path = f"stems/{project_id}/{stem_name}.wav"
-                storage.upload(local_path, remote_path)
-                stem_paths[stem_name] = remote_path
+            # Separate stems with the worker's warm model
+            with progress.stage("separate", model=model):
+                stems = separator.separate_array(wav)
+            del wav
+
+            with progress.stage("upload"):
+                stem_paths, published = _publish_stems(
+                    file_hash,
+                    model,
+                    stems,
+                    sample_rate,
+                    progress
+                )
 
             # Update project
+            await repo.set_checkpoints(project_id, published)
             await repo.update_stems(project_id, stem_paths)
             await repo.update_status(project_id, "ready")
+            await repo.update_stage(project_id, "separate", "complete")
+        finally:
+            if not handed_off:
+                lock.release()
 
+        progress.complete(status="ready")
         return {"status": "success", "project_id": project_id}
 
+    except SeparationInFlight:
+        raise
     except Exception as e:
         await repo.update_status(project_id, "error")
+        await repo.update_stage(project_id, "separate", "error", error=str(e))
+        progress.fail(e)
         raise e
 
 
-@celery_app.task(bind=True, name="tasks.separate_stems")
+@celery_app.task(
+    bind=True,
+    name="tasks.separate_stems",
+    on_give_up=_separation_given_up
+)
 def separate_stems(self, project_id: str):
-    """Task to separate stems from a music file."""
-    # Run async code in a single event loop
-    return asyncio.run(_separate_stems_async(project_id))
+    """
+    Task to separate stems from a music file.
+
+    Tracks longer than DEMUCS_CHUNK_SECONDS are split into overlapping
+    chunks: this task is replaced by a chord of separate_chunk tasks
+    (spread over the separation workers) and stitch_stems, so anything
+    chained after it runs once the stitched stems are published.
+
+    Published stems and separated chunks are checkpointed on the
+    project, so a retry or redelivery only redoes what is missing.
+
+    While an identical upload is being separated, the task retries every
+    SEPARATION_LOCK_RETRY seconds instead of holding a worker slot, until
+    the holder releases the lock (or it expires).
+    """
+    try:
+        # Run on the worker's long-lived event loop
+        result = run_async(_separate_stems_async(
+            project_id,
+            waiting=self.request.retries > 0
+        ))
+    except SeparationInFlight as e:
+        raise self.retry(
+            exc=e,
+            countdown=SEPARATION_LOCK_RETRY,
+            max_retries=None
+        )
+    if isinstance(result, Signature):
+        raise self.replace(result)
+    return result
+
+
+@celery_app.task(name="tasks.separate_chunk", on_give_up=_chunk_given_up)
+def separate_chunk(
+    project_id: str,
+    index: int,
+    input_path: str,
+    start: int,
+    end: int,
+    file_hash: str,
+    model: str,
+    stats: tuple[float, float],
+    token: bytes,
+    count: int
+):
+    """
+    Separate one chunk of a long track (checkpointed as ``chunk:{index}``).
+
+    Returns:
+        Dict with the chunk index and storage path of each stem's
+        (samples, channels) float32 array
+    """
+    storage = get_storage()
+    cache = get_cache()
+    repo = ProjectRepository()
+    separator = StemSeparator(model)
+    progress = _separation_progress(project_id, resume=True)
+
+    try:
+        # Redelivered after the chunk was done (worker lost before the ack)
+        project = run_async(repo.get_by_id(project_id))
+        finished = _finished_chunk(project.checkpoints, index, start, end)
+        if finished:
+            return finished
+
+        stems = separator.separate_array(
+            storage.download_array(input_path),
+            stats
+        )
+
+        prefix = f"{chunks_prefix(project_id)}{index}/"
+        stem_paths, entries = {}, {}
+        for stem_name, audio in stems.items():
+            stem_paths[stem_name] = f"{prefix}{stem_name}.npy"
+            entries[stem_name] = checkpoint(
+                stem_paths[stem_name],
+                storage.upload_array(audio, stem_paths[stem_name])
+            )
+        run_async(repo.set_checkpoints(project_id, {
+            f"chunk:{index}": {"start": start, "end": end, "stems": entries}
+        }))
+
+        # Re-arm the lock: chunks may wait in the queue behind other work
+        _extend(_separation_lock(model, file_hash, token))
+
+        # Chunks run concurrently: count completions in Redis
+        separated = cache.incr(_separated_key(project_id))
+        progress.update(separated / count, chunk=index)
+
+        return {"index": index, "stems": stem_paths}
+
+    except Exception as e:
+        _release(_separation_lock(model, file_hash, token))
+        _fail_separation(project_id, e, chunk=index)
+        raise e
+
+
+@celery_app.task(name="tasks.stitch_stems", on_give_up=_stitch_given_up)
+def stitch_stems(
+    chunks: list[dict],
+    project_id: str,
+    bounds: list[tuple[int, int]],
+    file_hash: str,
+    model: str,
+    token: bytes,
+    sample_rate: int,
+    done: list[dict] = None
+):
+    """
+    Crossfade the separated chunks of a long track and publish the stems.
+
+    Args:
+        chunks: Results of the separate_chunk tasks of this attempt
+        done: Chunks checkpointed by an earlier attempt
+    """
+    storage = get_storage()
+    repo = ProjectRepository()
+    lock = _separation_lock(model, file_hash, token)
+    progress = _separation_progress(project_id, resume=True)
+    progress.end_stage()
+    get_cache().delete(_separated_key(project_id))
+
+    try:
+        chunks = sorted(
+            (done or []) + chunks,
+            key=lambda chunk: chunk["index"]
+        )
+        fade = int(settings.DEMUCS_CHUNK_OVERLAP_SECONDS * sample_rate) // 2
+
+        stems = {
+            stem_name: stitch_chunks(
+                [
+                    storage.download_array(chunk["stems"][stem_name])
+                    for chunk in chunks
+                ],
+                bounds,
+                fade
+            )
+            for stem_name in chunks[0]["stems"]
+        }
+
+        with progress.stage("upload"):
+            stem_paths, published = _publish_stems(
+                file_hash,
+                model,
+                stems,
+                sample_rate,
+                progress
+            )
+
+        # Stems replace the chunk checkpoints (their arrays are deleted below)
+        run_async(repo.set_checkpoints(project_id, {
+            **published,
+            **{f"chunk:{index}": None for index in range(len(bounds))}
+        }))
+        run_async(repo.update_stems(project_id, stem_paths))
+        run_async(repo.update_status(project_id, "ready"))
+        run_async(repo.update_stage(
+            project_id,
+            "separate",
+            "complete",
+            chunks=len(chunks)
+        ))
+        storage.delete_prefix(chunks_prefix(project_id))
+
+        progress.complete(status="ready", chunks=len(chunks))
+        return {
+            "status": "success",
+            "project_id": project_id,
+            "chunks": len(chunks)
+        }
+
+    except Exception as e:
+        _fail_separation(project_id, e)
+        raise e
+
+    finally:
+        _release(lock)
@@ -1,105 +1,431 @@
 # src/tasks/synthesis.py
+from celery import chord
 from src.tasks.celery_app import celery_app
 from src.services.granular_synth import GranularSynthesizer
-from src.services.mixer import AudioMixer
-from src.storage.minio_client import MinIOClient
-from src.cache.redis_client import RedisCache
+from src.services.mixer import AudioMixer, MixBus
+from src.storage.minio_client import get_storage
+from src.cache.redis_client import get_cache
 from src.db.repositories import ProjectRepository, MixRepository, StyleSoundRepository
-from src.tasks.analysis import build_grain_library
-import librosa
+from src.tasks.analysis import (
+    build_grain_library,
+    analyze_stem_audio,
+    analysis_cache_key,
+    ANALYSIS_WINDOW_MS
+)
+from src.tasks.artifacts import (
+    load_stem,
+    get_artifact_cache,
+    get_render_cache,
+    get_grain_store
+)
+from src.tasks.progress import ProgressReporter, progress_key
+from src.tasks.checkpoints import checkpoint, is_valid
+from src.storage.render_cache import render_key
+from src.api.v1.mix.schemas import MixSettings
+from src.config.settings import get_settings
 import tempfile
 import os
-import asyncio
+from functools import lru_cache
+from src.tasks.runtime import run_async
 
+settings = get_settings()
 
-@celery_app.task(name="tasks.create_mix")
+SYNTH_STEMS = ["drums", "bass", "other"]
+
+# Relative duration of each stage, used for progress percent and ETA
+MIX_STAGES = {"prepare": 0.05, "render": 0.75, "mix": 0.1, "upload": 0.1}
+
+
+def _mix_progress(mix_id: str, resume: bool = True) -> ProgressReporter:
+    """Progress reporter of a mix (shared by the tasks of its chord)."""
+    if resume:
+        return ProgressReporter.resume(f"mix:{mix_id}", "mix", MIX_STAGES)
+    return ProgressReporter(f"mix:{mix_id}", "mix", MIX_STAGES)
+
+
+def _fail_mix(mix_id: str, error: Exception, **detail):
+    """Record a failed mix on its row and progress."""
+    run_async(MixRepository().update_status(mix_id, "error"))
+    _mix_progress(mix_id).fail(error, **detail)
+
+
+def _mix_given_up(task, exc, mix_id: str):
+    _fail_mix(mix_id, exc)
+
+
+def _stem_given_up(task, exc, mix_id: str, stem_name: str):
+    _fail_mix(mix_id, exc, stem=stem_name)
+
+
+def _finalize_given_up(
+    task,
+    exc,
+    rendered: list[dict],
+    mix_id: str,
+    cached: list[dict] = None
+):
+    _fail_mix(mix_id, exc)
+
+
+def _rendered_key(mix_id: str) -> str:
+    """Counter of rendered stems of a mix."""
+    return f"{progress_key(f'mix:{mix_id}')}:rendered"
+
+
+def _stems_to_render(config: dict) -> list[str]:
+    """Synthesized stems enabled in a mix config."""
+    return [
+        stem_name for stem_name in SYNTH_STEMS
+        if config.get(stem_name, {}).get("enabled", False)
+        and config.get(stem_name, {}).get("style_sound_id")
+    ]
+
+
+def _mix_settings(mix) -> dict:
+    """
+    Resolved mix settings: defaults filled in (older mixes lack newer
+    fields) and the preset expanded, so the name itself is dropped.
+    """
+    return MixSettings(**(mix.settings or {})).dict(exclude={"preset"})
+
+
+@lru_cache(maxsize=8)
+def get_synthesizer(
+    grain_duration_ms: int,
+    use_pitch_mapping: bool,
+    use_envelope: bool
+) -> GranularSynthesizer:
+    """
+    Worker-wide synthesizer per settings combination.
+
+    Reuses the precomputed envelope and analyzers across mixes; the seed
+    is passed per render, so sharing an instance stays reproducible.
+    """
+    return GranularSynthesizer(
+        grain_duration_ms=grain_duration_ms,
+        use_pitch_mapping=use_pitch_mapping,
+        use_envelope=use_envelope
+    )
+
+
+def _bank_cache_key(grain_cache_key: str, synth: GranularSynthesizer) -> str:
+    """Redis key of a library's grain bank for a synthesizer's settings."""
+    decay_samples, use_envelope, dtype = synth.bank_key
+    envelope = int(use_envelope)
+    return f"{grain_cache_key}:bank:{decay_samples}:{envelope}:{dtype}"
+
+
+def _analysis_field(stem_name: str, window_ms: int) -> str:
+    """Field of a stem's analysis (see analysis_cache_key()) for a window."""
+    if window_ms == ANALYSIS_WINDOW_MS:
+        return stem_name
+    return f"{stem_name}@{window_ms}ms"
+
+
+def _render_key(project, stem_name: str, style, mix_settings: dict) -> str:
+    """Render cache key: stem content, style library, settings and seed."""
+    return render_key({
+        "stem": stem_name,
+        # Content-addressed (stems/{model}/{sha256}/) for deduplicated uploads
+        "stem_path": getattr(project, f"{stem_name}_path"),
+        "style": style.file_hash or str(style.id),
+        "settings": mix_settings,
+    })
+
+
+@celery_app.task(name="tasks.create_mix", on_give_up=_mix_given_up)
 def create_mix(mix_id: str):
-    """Create complete mix."""
+    """
+    Create complete mix.
+
+    Stems already rendered with the same stem, style, settings and seed
+    come from the render cache, so a volume-only edit just re-mixes.
+    The remaining stems are independent, so each one is rendered by its
+    own render_stem task (a Celery chord running on the regular worker
+    pool) and finalize_mix mixes them once all are done.
 
-    storage = MinIOClient()
-    cache = RedisCache()
+    On a retry or redelivery, renders come back from the render cache
+    and an output already uploaded (``output`` checkpoint) is kept.
+    """
+    cache = get_cache()
+    render_cache = get_render_cache()
     mix_repo = MixRepository()
     project_repo = ProjectRepository()
     style_repo = StyleSoundRepository()
 
-    synth = GranularSynthesizer()
-    mixer = AudioMixer()
-
-    # Fetch data
-    mix = asyncio.run(mix_repo.get_by_id(mix_id))
-    project = asyncio.run(project_repo.get_by_id(mix.project_id))
-    config = mix.config
+    mix = run_async(mix_repo.get_by_id(mix_id))
+    if is_valid(get_storage(), (mix.checkpoints or {}).get("output")):
+        # Only the row update was left undone
+        return finalize_mix([], mix_id)
 
-    asyncio.run(mix_repo.update_status(mix_id, "processing"))
+    progress = _mix_progress(mix_id, resume=False)
 
     try:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            stems_output = {}
-
-            # Load vocals (not processed)
-            if config.get("vocals", {}).get("enabled", True):
-                vocals_local = os.path.join(tmpdir, "vocals.wav")
-                storage.download(project.vocals_path, vocals_local)
-                vocals, _ = librosa.load(vocals_local, sr=44100)
-                stems_output["vocals"] = vocals * config["vocals"].get("volume", 1.0)
-
-            # Process each stem with granular synthesis
-            for stem_name in ["drums", "bass", "other"]:
-                stem_config = config.get(stem_name, {})
-
-                if not stem_config.get("enabled", False):
-                    continue
-
-                style_id = stem_config.get("style_sound_id")
-                if not style_id:
-                    continue
-
-                # Load base stem
-                stem_path = getattr(project, f"{stem_name}_path")
-                stem_local = os.path.join(tmpdir, f"{stem_name}.wav")
-                storage.download(stem_path, stem_local)
-                stem_audio, _ = librosa.load(stem_local, sr=44100)
-
-                # Load grain library from cache
-                style = asyncio.run(style_repo.get_by_id(style_id))
-                grain_library = cache.get_grains(style.grain_cache_key)
-
-                if not grain_library:
-                    # Rebuild if not in cache
-                    build_grain_library(style_id)
-                    grain_library = cache.get_grains(style.grain_cache_key)
-
-                # Synthesize
-                instrument_type = "drums" if stem_name == "drums" else "melodic"
-                synthesized = synth.synthesize(
-                    stem_audio,
-                    grain_library,
-                    instrument_type=instrument_type
+        with progress.stage("prepare"):
+            project = run_async(project_repo.get_by_id(str(mix.project_id)))
+            mix_settings = _mix_settings(mix)
+            stem_names = _stems_to_render(mix.config)
+
+            run_async(mix_repo.update_status(mix_id, "processing"))
+            cache.delete(_rendered_key(mix_id))
+
+            cached, missing = [], []
+            for stem_name in stem_names:
+                style_id = mix.config[stem_name]["style_sound_id"]
+                style = run_async(style_repo.get_by_id(style_id))
+                if style is None:
+                    raise ValueError(f"Style sound {style_id} not found")
+                path = render_cache.get(
+                    _render_key(project, stem_name, style, mix_settings)
                 )
+                if path is None:
+                    missing.append(stem_name)
+                else:
+                    cached.append({"stem": stem_name, "path": path})
+
+        progress.start_stage(
+            "render",
+            stems=missing,
+            cached=[stem["stem"] for stem in cached]
+        )
+        if cached:
+            cache.incr(_rendered_key(mix_id), amount=len(cached))
+
+        if settings.MIX_PARALLEL_STEMS and len(missing) > 1:
+            chord(
+                render_stem.s(mix_id, stem_name) for stem_name in missing
+            )(finalize_mix.s(mix_id, cached=cached))
+            return {"status": "dispatched", "mix_id": mix_id, "stems": missing}
 
-                volume = stem_config.get("volume", 1.0)
-                stems_output[stem_name] = synthesized * volume
+    except Exception as e:
+        _fail_mix(mix_id, e)
+        raise e
+
+    # Serial path (or re-mix only, when every stem is cached):
+    # run the same steps in this process
+    rendered = [render_stem(mix_id, stem_name) for stem_name in missing]
+    return finalize_mix(rendered, mix_id, cached=cached)
 
-            # Mix everything
-            final_mix = mixer.mix(stems_output)
-            final_mix = mixer.normalize(final_mix)
 
-            # Export
-            output_local = os.path.join(tmpdir, "mix_output.wav")
-            mixer.export(final_mix, output_local)
+def _synthesize_stem(
+    project,
+    stem_name: str,
+    style,
+    synth: GranularSynthesizer,
+    seed: int
+):
+    """Granular render of one stem of a project with a style sound."""
+    cache = get_cache()
+    store = get_grain_store()
+    project_repo = ProjectRepository()
+    style_id = str(style.id)
+
+    # Load base stem (memory-mapped from the worker's artifact cache)
+    stem_audio = load_stem(getattr(project, f"{stem_name}_path"))
 
-            # Upload
-            output_path = f"mixes/{mix_id}/output.wav"
-            storage.upload(output_local, output_path)
+    # Load grain library (process LRU -> Redis -> storage)
+    grain_library = store.get(style_id)
 
-            # Update
-            asyncio.run(mix_repo.update(mix_id, {
+    if grain_library is None:
+        # Rebuild; waits instead if another worker is already rebuilding
+        build_grain_library(style_id)
+        grain_library = store.get(style_id, count=False)
+
+    # Pre-rendered grain bank for these settings, kept next to the library
+    # (libraries from the process LRU already carry theirs). Only small
+    # banks go through Redis; large ones are cheaper to render locally.
+    if synth.bank_key not in grain_library.banks:
+        bank_key = _bank_cache_key(store.redis_key(style_id), synth)
+        shape = (len(grain_library), synth.decay_samples)
+        bank_bytes = shape[0] * shape[1] * synth.dtype.itemsize
+        shared = bank_bytes <= settings.GRAIN_BANK_REDIS_MAX_MB * 1024 * 1024
+        bank = cache.get_array(bank_key) if shared else None
+        if bank is None or bank.shape != shape:
+            bank = synth.grain_bank(grain_library)
+            if bank is not None and shared:
+                cache.set_array(bank_key, bank)
+        if bank is not None:
+            store.add_bank(style_id, synth.bank_key, bank)
+
+    # Onset/pitch analysis shared by every mix of the project, one entry
+    # per analysis window (= grain duration), computed only on a miss
+    analysis_key = project.analysis_cache_key or analysis_cache_key(project)
+    field = _analysis_field(stem_name, synth.grain_duration_ms)
+    stem_analysis = (cache.get_json(analysis_key) or {}).get(field)
+    if (
+        stem_analysis is not None
+        and stem_analysis.get("window_ms", ANALYSIS_WINDOW_MS)
+        != synth.grain_duration_ms
+    ):
+        # Written by an older version under the plain name
+        stem_analysis = None
+    if stem_analysis is None and synth.use_pitch_mapping:
+        stem_analysis = analyze_stem_audio(
+            stem_audio,
+            window_ms=synth.grain_duration_ms
+        )
+        # Other stems of this mix may be writing concurrently
+        cache.merge_json(analysis_key, {field: stem_analysis})
+        if project.analysis_cache_key != analysis_key:
+            run_async(project_repo.update(
+                str(project.id),
+                {"analysis_cache_key": analysis_key}
+            ))
+
+    # Synthesize. Without pitch mapping and a cached table, the
+    # synthesizer only detects onsets and peaks (no pYIN pass).
+    instrument_type = "drums" if stem_name == "drums" else "melodic"
+    return synth.synthesize(
+        stem_audio,
+        grain_library,
+        instrument_type=instrument_type,
+        onset_table=stem_analysis["pitch_data"] if stem_analysis else None,
+        seed=seed
+    )
+
+
+@celery_app.task(name="tasks.render_stem", on_give_up=_stem_given_up)
+def render_stem(mix_id: str, stem_name: str):
+    """
+    Render one stem of a mix through the render cache.
+
+    Returns:
+        Dict with stem name and storage path of the rendered float32 array
+        (volume not applied)
+    """
+    cache = get_cache()
+    render_cache = get_render_cache()
+    mix_repo = MixRepository()
+    project_repo = ProjectRepository()
+    style_repo = StyleSoundRepository()
+
+    progress = _mix_progress(mix_id)
+
+    try:
+        mix = run_async(mix_repo.get_by_id(mix_id))
+        project = run_async(project_repo.get_by_id(str(mix.project_id)))
+        mix_settings = _mix_settings(mix)
+        style_id = mix.config[stem_name]["style_sound_id"]
+        style = run_async(style_repo.get_by_id(style_id))
+
+        # Another mix may have rendered it since create_mix looked
+        key = _render_key(project, stem_name, style, mix_settings)
+        output_path = render_cache.get(key)
+        if output_path is None:
+            synth = get_synthesizer(
+                mix_settings["grain_duration_ms"],
+                mix_settings["use_pitch_mapping"],
+                mix_settings["use_envelope"]
+            )
+            synthesized = _synthesize_stem(
+                project, stem_name, style, synth, seed=mix_settings["seed"]
+            )
+            output_path = render_cache.put(key, synthesized)
+
+        # Stems render concurrently: count completions in Redis
+        rendered = cache.incr(_rendered_key(mix_id))
+        progress.update(
+            rendered / len(_stems_to_render(mix.config)),
+            stem=stem_name
+        )
+
+        return {"stem": stem_name, "path": output_path}
+
+    except Exception as e:
+        _fail_mix(mix_id, e, stem=stem_name)
+        raise e
+
+
+@celery_app.task(name="tasks.finalize_mix", on_give_up=_finalize_given_up)
+def finalize_mix(rendered: list[dict], mix_id: str, cached: list[dict] = None):
+    """
+    Mix vocals and rendered stems, export and upload the result.
+
+    Args:
+        rendered: ``{"stem", "path"}`` of the stems rendered for this mix
+        mix_id: Mix ID
+        cached: ``{"stem", "path"}`` of the stems taken from the render cache
+    """
+
+    storage = get_storage()
+    artifact_cache = get_artifact_cache()
+    cache = get_cache()
+    mix_repo = MixRepository()
+    project_repo = ProjectRepository()
+
+    mixer = AudioMixer()
+    progress = _mix_progress(mix_id)
+    progress.end_stage()
+    cache.delete(_rendered_key(mix_id))
+
+    try:
+        mix = run_async(mix_repo.get_by_id(mix_id))
+        output_path = f"mixes/{mix_id}/output.wav"
+
+        if is_valid(storage, (mix.checkpoints or {}).get("output")):
+            # Uploaded by an earlier attempt
+            progress.skip("mix", "upload")
+            run_async(mix_repo.update(mix_id, {
                 "status": "complete",
                 "output_path": output_path
             }))
+            progress.complete(
+                status="complete",
+                output_path=output_path,
+                resumed=True
+            )
+            return {
+                "status": "success",
+                "mix_id": mix_id,
+                "output_path": output_path
+            }
+
+        project = run_async(project_repo.get_by_id(str(mix.project_id)))
+        config = mix.config
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with progress.stage("mix"):
+                # Stems are accumulated as soon as they are loaded
+                bus = MixBus()
+
+                # Load vocals (not processed)
+                if config.get("vocals", {}).get("enabled", True):
+                    vocals = load_stem(project.vocals_path)
+                    bus.add(vocals, config["vocals"].get("volume", 1.0))
+                    del vocals
+
+                for stem in (cached or []) + rendered:
+                    # Renders are immutable, so repeated re-mixes on this
+                    # worker memory-map them from the local cache
+                    synthesized = artifact_cache.open_array(stem["path"])
+                    volume = config[stem["stem"]].get("volume", 1.0)
+                    bus.add(synthesized, volume)
+                    del synthesized
+
+                # Mix everything
+                final_mix = bus.render(normalize=True)
+
+            with progress.stage("upload"):
+                # Export
+                output_local = os.path.join(tmpdir, "mix_output.wav")
+                mixer.export(final_mix, output_local)
+
+                # Upload
+                etag = storage.upload(output_local, output_path)
+
+        run_async(mix_repo.set_checkpoints(mix_id, {
+            "output": checkpoint(output_path, etag)
+        }))
+
+        # Update
+        run_async(mix_repo.update(mix_id, {
+            "status": "complete",
+            "output_path": output_path
+        }))
 
+        progress.complete(status="complete", output_path=output_path)
         return {"status": "success", "mix_id": mix_id, "output_path": output_path}
 
     except Exception as e:
-        asyncio.run(mix_repo.update_status(mix_id, "error"))
+        _fail_mix(mix_id, e)
         raise e
@@ -0,0 +1,28 @@
+# tests/grain_index_reference.py
+"""
+Linear nearest-pitch scan, the oracle for GrainIndex (also timed against
+it by benchmarks/grain_selection.py), and the pitch sets it is checked on.
+"""
+import numpy as np
+
+
+def linear_scan(pitches: list[float], target: float) -> int:
+    """Index version of the original GranularSynthesizer._select_grain."""
+    return min(range(len(pitches)), key=lambda i: abs(pitches[i] - target))
+
+
+def tied_case(rng: np.random.Generator) -> tuple[list[float], np.ndarray]:
+    """
+    Grain pitches and targets full of duplicates and equidistant ties.
+
+    Returns:
+        Up to 60 pitches from a small integer set, and 80 targets (on the
+        same grid and uniform between the pitches)
+    """
+    n = int(rng.integers(1, 60))
+    pitches = [float(p) for p in rng.integers(0, 20, size=n) * 10.0]
+    targets = np.concatenate([
+        rng.integers(1, 200, size=40) * 5.0,
+        rng.uniform(0.1, 250.0, size=40),
+    ])
+    return pitches, targets
@@ -0,0 +1,63 @@
+# tests/overlap_add_reference.py
+"""
+Per-onset grain placement, the oracle for GranularSynthesizer's batched
+overlap-add kernel (also timed against it by benchmarks/overlap_add.py).
+"""
+import numpy as np
+
+from src.services.grain_builder import Grain, GrainLibrary
+from src.services.granular_synth import GranularSynthesizer
+
+
+def process_grain(
+    synth: GranularSynthesizer,
+    grain_audio: np.ndarray,
+    amplitude: float
+) -> np.ndarray:
+    """One grain tiled/truncated to decay_samples, enveloped and scaled."""
+    grain_audio = grain_audio.astype(synth.dtype, copy=False)
+    amplitude = synth.dtype.type(amplitude)
+    if len(grain_audio) < synth.decay_samples:
+        repeats = int(np.ceil(synth.decay_samples / len(grain_audio)))
+        grain_ready = np.tile(grain_audio, repeats)[:synth.decay_samples]
+    else:
+        grain_ready = grain_audio[:synth.decay_samples]
+
+    if synth.use_envelope:
+        return (grain_ready * synth.envelope) * amplitude
+    return grain_ready * amplitude
+
+
+def reference_loop(synth, base_stem, library, onset_table, seed):
+    """Original GranularSynthesizer.synthesize placement loop."""
+    targets = [entry["pitch"] for entry in onset_table]
+    grain_ids = library.index.select(targets, np.random.default_rng(seed))
+
+    output = np.zeros(len(base_stem), dtype=synth.dtype)
+    for entry, grain_id in zip(onset_table, grain_ids):
+        onset = entry["start"]
+        processed = process_grain(synth, library[grain_id].audio, entry["peak"])
+        end_pos = min(onset + len(processed), len(output))
+        output[onset:end_pos] += processed[:end_pos - onset]
+    return output
+
+
+def make_case(rng, n_samples, n_onsets, n_grains=300):
+    """Random grain library and onset table over ``n_samples``."""
+    library = GrainLibrary.from_grains([
+        Grain(
+            # 200..12000 samples: both tiled and truncated at 120 ms
+            audio=rng.standard_normal(int(rng.integers(200, 12000))).astype(np.float32),
+            pitch=float(rng.uniform(40, 800)),
+            rms=0.5
+        )
+        for _ in range(n_grains)
+    ])
+    starts = np.sort(rng.integers(0, n_samples, size=n_onsets))
+    # Force grains that run past the end of the buffer
+    starts[-3:] = [n_samples - 1, n_samples - 10, n_samples - 5000]
+    onset_table = [
+        {"start": int(s), "pitch": float(rng.uniform(0, 900)), "peak": float(rng.uniform(0, 1))}
+        for s in np.sort(starts)
+    ]
+    return library, onset_table
@@ -0,0 +1,29 @@
+# tests/separation_fixtures.py
+"""
+Synthetic track and SDR shared by the chunked separation tests and
+benchmarks/chunked_separation.py.
+"""
+import numpy as np
+
+
+def synthetic_track(seconds: float, sample_rate: int) -> np.ndarray:
+    """Stereo (channels, samples) mixture: kick/hat pattern, bass line, chords."""
+    rng = np.random.default_rng(0)
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    beat = (t * 2) % 1  # 120 bpm
+
+    kick = np.sin(2 * np.pi * 55 * t * np.exp(-beat * 4)) * np.exp(-beat * 20)
+    hats = rng.standard_normal(n) * np.exp(-((t * 4) % 1) * 60) * 0.2
+    bass_freq = 41.2 * 2 ** (np.array([0, 3, 5, 7])[(t // 2).astype(int) % 4] / 12)
+    bass = 0.4 * np.sin(2 * np.pi * np.cumsum(bass_freq) / sample_rate)
+    chords = sum(0.1 * np.sin(2 * np.pi * 220 * r * t) for r in (1, 1.26, 1.5))
+
+    mono = kick + hats + bass + chords
+    return np.stack([mono, 0.9 * mono + 0.1 * chords]).astype(np.float32) * 0.5
+
+
+def sdr(reference: np.ndarray, estimate: np.ndarray) -> float:
+    """Signal-to-distortion ratio (dB) of an estimate against a reference."""
+    noise = np.sum((reference - estimate) ** 2)
+    return float(10 * np.log10(np.sum(reference ** 2) / max(noise, 1e-12)))
@@ -0,0 +1,129 @@
+# tests/test_chunked_separation.py
+import numpy as np
+import pytest
+
+from src.services.stem_separator import chunk_bounds, normalization_stats, stitch_chunks
+from tests.separation_fixtures import sdr, synthetic_track
+
+# Seams may be at most this much worse than the rest of the track (dB),
+# and never below MIN_SEAM_SDR, against the whole-file separation
+SEAM_TOLERANCE_DB = 3.0
+MIN_SEAM_SDR = 15.0
+
+
+@pytest.mark.parametrize("n_samples", [1000, 300_000, 1_234_567])
+@pytest.mark.parametrize("chunk, overlap", [(100_000, 20_000), (250_000, 1000), (50_000, 8000)])
+def test_chunk_bounds_cover_the_track(n_samples, chunk, overlap):
+    bounds = chunk_bounds(n_samples, chunk, overlap)
+
+    assert bounds[0][0] == 0 and bounds[-1][1] == n_samples
+    assert all(end - start <= chunk for start, end in bounds)
+    assert all(bounds[i][1] - bounds[i + 1][0] == overlap for i in range(len(bounds) - 1))
+
+
+@pytest.mark.parametrize("n_samples", [1000, 300_000, 1_234_567])
+@pytest.mark.parametrize("chunk, overlap, fade", [
+    (100_000, 20_000, 10_000),
+    (250_000, 1000, 1000),
+    (50_000, 8000, 0),
+])
+def test_identity_chunks_stitch_back_to_the_input(n_samples, chunk, overlap, fade):
+    signal = np.random.default_rng(n_samples).standard_normal((n_samples, 2)).astype(np.float32)
+    bounds = chunk_bounds(n_samples, chunk, overlap)
+
+    stitched = stitch_chunks([signal[start:end] for start, end in bounds], bounds, fade)
+
+    assert stitched.shape == signal.shape
+    assert np.allclose(stitched, signal, atol=1e-5)
+
+
+class EdgeBlindEngine:
+    """
+    Stand-in for the separation engine: splits a (channels, samples)
+    signal into a moving-average "low" stem and the residual "high" stem,
+    normalized with the given stats. Like Demucs it sees nothing past
+    the ends of its input, so its output is wrong within ``context``
+    samples of each chunk edge.
+    """
+
+    def __init__(self, context: int):
+        self.context = context
+
+    def separate(self, wav: np.ndarray, stats=None) -> dict:
+        mean, std = stats or normalization_stats(wav)
+        normalized = (wav - mean) / std
+        kernel = np.ones(2 * self.context + 1) / (2 * self.context + 1)
+        low = np.stack([
+            np.convolve(channel, kernel, mode="same") for channel in normalized
+        ])
+        return {
+            "low": (low * std + mean).T,
+            "high": ((normalized - low) * std).T,
+        }
+
+
+@pytest.mark.parametrize("n_samples", [60_000, 123_457])
+def test_stitched_chunks_match_whole_file_with_edge_errors(n_samples):
+    engine = EdgeBlindEngine(context=500)
+    wav = np.random.default_rng(n_samples).standard_normal((2, n_samples))
+    overlap, fade = 8000, 4000
+    bounds = chunk_bounds(n_samples, 20_000, overlap)
+    assert len(bounds) > 1
+
+    whole = engine.separate(wav)
+    stats = normalization_stats(wav)
+    chunks = [engine.separate(wav[:, start:end], stats) for start, end in bounds]
+
+    # The engine does get the chunk edges wrong...
+    start, end = bounds[1]
+    assert not np.allclose(chunks[1]["low"][:10], whole["low"][start:start + 10])
+
+    # ...but the stitched stems only take each chunk away from its edges
+    for name in whole:
+        stitched = stitch_chunks([chunk[name] for chunk in chunks], bounds, fade)
+        assert stitched.shape == whole[name].shape
+        assert np.allclose(stitched, whole[name], atol=1e-9), name
+
+
+def test_chunked_separation_matches_whole_file_at_seams():
+    pytest.importorskip("torch")
+    pytest.importorskip("demucs")
+    from src.services.stem_separator import SeparationEngine
+
+    # Deterministic (no random shifts); the stitching does not depend on
+    # the model, so the single htdemucs model keeps this reasonably fast
+    engine = SeparationEngine("htdemucs", device="cpu", shifts=0)
+    sample_rate = engine.sample_rate
+
+    def separate(wav, stats=None):
+        sources = engine.separate_tensor(engine.torch.from_numpy(np.ascontiguousarray(wav)), stats)
+        return {name: source.numpy().T for name, source in sources.items()}
+
+    wav = synthetic_track(40, sample_rate)
+    overlap = 4 * sample_rate
+    bounds = chunk_bounds(wav.shape[1], 16 * sample_rate, overlap)
+    assert len(bounds) > 1
+
+    whole = separate(wav)
+    stats = normalization_stats(wav)
+    chunks = [separate(wav[:, start:end], stats) for start, end in bounds]
+    stitched = {
+        name: stitch_chunks([chunk[name] for chunk in chunks], bounds, overlap // 2)
+        for name in whole
+    }
+
+    # +-1 s around the middle of each overlap, where the crossfade is
+    near_seams = np.zeros(wav.shape[1], dtype=bool)
+    for start, _ in bounds[1:]:
+        centre = start + overlap // 2
+        near_seams[centre - sample_rate:centre + sample_rate] = True
+
+    # Pooled over the stems (some carry almost nothing of this track)
+    reference = np.concatenate([whole[name] for name in whole])
+    estimate = np.concatenate([stitched[name] for name in whole])
+    mask = np.concatenate([near_seams] * len(whole))
+    seam_sdr = sdr(reference[mask], estimate[mask])
+    rest_sdr = sdr(reference[~mask], estimate[~mask])
+
+    assert seam_sdr >= rest_sdr - SEAM_TOLERANCE_DB, (seam_sdr, rest_sdr)
+    assert seam_sdr >= MIN_SEAM_SDR, (seam_sdr, rest_sdr)
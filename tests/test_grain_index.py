@@ -0,0 +1,28 @@
+# tests/test_grain_index.py
+import numpy as np
+import pytest
+
+from src.services.grain_index import GrainIndex
+from tests.grain_index_reference import linear_scan, tied_case
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest_matches_linear_scan(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(40):
+        pitches, targets = tied_case(rng)
+        expected = [linear_scan(pitches, float(t)) for t in targets]
+        assert GrainIndex(pitches).nearest(targets).tolist() == expected
+
+
+def test_ties_go_to_the_first_grain():
+    index = GrainIndex([200.0, 100.0, 300.0, 100.0])
+    # 150 is equidistant from 100 (indices 1, 3) and 200 (index 0)
+    assert index.nearest([150.0, 100.0, 250.0]).tolist() == [0, 1, 0]
+
+
+def test_select_picks_random_grains_for_unpitched_targets():
+    index = GrainIndex([100.0, 200.0, 300.0])
+    selected = index.select([0.0] * 50 + [190.0], np.random.default_rng(0))
+    assert selected[-1] == 1
+    assert set(selected[:-1].tolist()) <= {0, 1, 2}
@@ -0,0 +1,134 @@
+# tests/test_grain_store.py
+import numpy as np
+
+from src.services.grain_builder import Grain, GrainLibrary
+from src.storage.grain_store import GrainLibraryStore
+
+MB = 1024 * 1024
+
+
+class MemoryRedis:
+    """The few redis-py calls the store makes, on dicts."""
+
+    def __init__(self):
+        self.values, self.hashes = {}, {}
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def hincrby(self, key, field, amount):
+        counters = self.hashes.setdefault(key, {})
+        counters[field.encode()] = counters.get(field.encode(), 0) + amount
+
+    def hgetall(self, key):
+        return {k: str(v).encode() for k, v in self.hashes.get(key, {}).items()}
+
+
+class MemoryCache:
+    def __init__(self):
+        self.client = MemoryRedis()
+
+    def set_bytes(self, key, data, ttl):
+        self.client.setex(key, ttl, data)
+
+    def get_bytes(self, key):
+        return self.client.get(key)
+
+
+class MemoryStorage:
+    def __init__(self):
+        self.objects = {}
+
+    def upload_bytes(self, data, remote_path):
+        self.objects[remote_path] = data
+
+
+def make_library() -> GrainLibrary:
+    return GrainLibrary.from_grains([
+        Grain(audio=np.ones(100, dtype=np.float32), pitch=100.0, rms=1.0)
+    ])
+
+
+def make_store(max_local: int = 8, max_bank_mb: int = 3) -> GrainLibraryStore:
+    return GrainLibraryStore(
+        MemoryStorage(),
+        MemoryCache(),
+        max_local=max_local,
+        max_bank_bytes=max_bank_mb * MB
+    )
+
+
+def bank(mb: int) -> np.ndarray:
+    return np.zeros(mb * MB, dtype=np.uint8)
+
+
+def test_banks_of_least_recently_used_libraries_are_dropped_first():
+    store = make_store()
+    libraries = {style_id: make_library() for style_id in "abc"}
+    for style_id, library in libraries.items():
+        store.put(style_id, library)
+        store.add_bank(style_id, ("bank",), bank(1))
+
+    store.add_bank("a", ("other",), bank(1))
+
+    assert list(libraries["a"].banks) == [("bank",), ("other",)]
+    assert libraries["b"].banks == {}
+    assert list(libraries["c"].banks) == [("bank",)]
+    assert store.stats()["local_bank_bytes"] == 3 * MB
+
+
+def test_get_marks_a_library_as_recently_used():
+    store = make_store(max_bank_mb=2)
+    libraries = {style_id: make_library() for style_id in "ab"}
+    for style_id, library in libraries.items():
+        store.put(style_id, library)
+        store.add_bank(style_id, ("bank",), bank(1))
+
+    assert store.get("a") is libraries["a"]
+    store.put("c", make_library())
+    store.add_bank("c", ("bank",), bank(1))
+
+    assert list(libraries["a"].banks) == [("bank",)]
+    assert libraries["b"].banks == {}
+
+
+def test_newest_bank_is_kept_over_budget():
+    store = make_store(max_bank_mb=1)
+    library = make_library()
+    store.put("a", library)
+
+    store.add_bank("a", ("small",), bank(1))
+    store.add_bank("a", ("large",), bank(2))
+
+    assert list(library.banks) == [("large",)]
+    assert store.stats()["local_bank_bytes"] == 2 * MB
+
+
+def test_bank_of_an_evicted_library_is_not_kept():
+    store = make_store(max_local=1)
+    evicted = make_library()
+    store.put("a", evicted)
+    store.put("b", make_library())
+
+    store.add_bank("a", ("bank",), bank(1))
+
+    assert evicted.banks == {}
+    stats = store.stats()
+    assert stats["local_entries"] == 1
+    assert stats["local_bank_bytes"] == 0
+    assert stats["builds"] == 2
+
+
+def test_library_put_by_another_process_comes_from_redis():
+    cache = MemoryCache()
+    library = make_library()
+    GrainLibraryStore(MemoryStorage(), cache).put("a", library)
+
+    fetched = GrainLibraryStore(MemoryStorage(), cache).get("a")
+
+    assert fetched is not library
+    assert np.array_equal(fetched.samples, library.samples)
+    assert fetched.pitches.tolist() == library.pitches.tolist()
@@ -0,0 +1,72 @@
+# tests/test_mix_settings.py
+import asyncio
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from src.api.v1.mix.schemas import MixSettings
+from src.main import app
+
+
+def post(path: str, payload: dict) -> int:
+    """Status code of a JSON POST sent straight to the ASGI app."""
+    body = json.dumps(payload).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("test", 0),
+        "server": ("test", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"]
+
+
+def mix_request(**settings) -> dict:
+    return {"project_id": "project", "config": {}, "settings": settings}
+
+
+@pytest.mark.parametrize("settings", [
+    {"grain_duration_ms": 0},
+    {"grain_duration_ms": -5},
+    {"grain_duration_ms": 100_000},
+    {"seed": -1},
+    {"seed": 2**32},
+    {"preset": "quality"},
+])
+def test_create_mix_rejects_out_of_range_settings(settings):
+    # Rejected by request validation, before the project is looked up
+    assert post("/api/v1/mix", mix_request(**settings)) == 422
+
+
+def test_settings_bounds_are_inclusive_where_documented():
+    MixSettings(grain_duration_ms=1, seed=0)
+    MixSettings(grain_duration_ms=1000, seed=2**32 - 1)
+    with pytest.raises(ValidationError):
+        MixSettings(grain_duration_ms=1001)
+
+
+def test_preset_fills_only_fields_not_given():
+    settings = MixSettings(preset="fast", grain_duration_ms=80)
+    assert settings.use_pitch_mapping is False
+    assert settings.grain_duration_ms == 80
@@ -0,0 +1,44 @@
+# tests/test_pitch_analyzer.py
+import numpy as np
+import pytest
+
+from src.services.pitch_analyzer import PitchAnalyzer
+
+WINDOW = 5292  # 120 ms at 44.1 kHz: 11 frames per window, hop 512
+
+
+def test_batch_only_when_windows_cover_more_frames_than_the_signal():
+    analyzer = PitchAnalyzer()
+    n_samples = 44100 * 60  # 5168 contour frames
+
+    assert not analyzer.batch_is_cheaper(100, WINDOW, n_samples)
+    assert not analyzer.batch_is_cheaper(469, WINDOW, n_samples)
+    assert analyzer.batch_is_cheaper(470, WINDOW, n_samples)
+    # Windows too short for pYIN are never analyzed either way
+    assert not analyzer.batch_is_cheaper(10_000, 1000, n_samples)
+
+
+@pytest.mark.parametrize("n_onsets, batch", [(4, False), (200, True)])
+def test_default_mode_follows_window_coverage(monkeypatch, n_onsets, batch):
+    analyzer = PitchAnalyzer()
+    audio = np.zeros(44100 * 2, dtype=np.float32)  # 173 contour frames
+    onsets = np.linspace(0, len(audio) - WINDOW, n_onsets).astype(int)
+    calls = {"contour": 0, "segment": 0}
+
+    def contour(audio):
+        calls["contour"] += 1
+        return np.zeros(0)
+
+    def analyze_segment(segment):
+        calls["segment"] += 1
+        return 0.0
+
+    monkeypatch.setattr(analyzer, "contour", contour)
+    monkeypatch.setattr(analyzer, "analyze_segment", analyze_segment)
+    results = analyzer.analyze_at_onsets(audio, onsets.tolist())
+
+    assert len(results) == n_onsets
+    assert calls == (
+        {"contour": 1, "segment": 0} if batch
+        else {"contour": 0, "segment": n_onsets}
+    )
@@ -0,0 +1,51 @@
+# tests/test_pool_stats.py
+"""
+pool_stats() reads counters that redis-py and urllib3 do not document;
+these tests fail on an upgrade that renames them, instead of the health
+endpoint quietly reporting None.
+"""
+import redis
+
+from src.cache import redis_client
+from src.storage import minio_client
+
+
+def test_redis_pool_counters(monkeypatch):
+    # Counters of an unused pool (taking a connection needs a server);
+    # a renamed attribute would show up as None
+    monkeypatch.setattr(
+        redis_client,
+        "_pool",
+        redis.ConnectionPool(max_connections=7)
+    )
+
+    assert redis_client.pool_stats() == {
+        "created": 0,
+        "in_use": 0,
+        "available": 0,
+        "max": 7,
+    }
+
+
+def test_minio_pool_counters(monkeypatch):
+    http_client = minio_client._http_pool()
+    storage = minio_client.MinIOClient(
+        http_client=http_client,
+        ensure_bucket=False
+    )
+    monkeypatch.setattr(minio_client, "_storage", storage)
+
+    # Host pools are created on first use, before any request is sent
+    http_client.connection_from_host("localhost", 9000, scheme="http")
+
+    stats = minio_client.pool_stats()
+    assert stats["hosts"] == 1
+    assert stats["connections"] == 0
+    assert stats["requests"] == 0
+
+
+def test_storage_without_our_pool_reports_nothing(monkeypatch):
+    storage = minio_client.MinIOClient(ensure_bucket=False)
+    monkeypatch.setattr(minio_client, "_storage", storage)
+
+    assert minio_client.pool_stats()["hosts"] == 0
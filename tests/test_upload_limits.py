@@ -0,0 +1,141 @@
+# tests/test_upload_limits.py
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+from src.api.v1.upload import router as upload_router
+from src.main import app
+
+BOUNDARY = "upload-test"
+
+
+def multipart(*files: tuple[str, bytes]) -> bytes:
+    """multipart/form-data body with each file under the ``files`` field."""
+    parts = [
+        (
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="files"; '
+            f'filename="{name}"\r\n'
+            "Content-Type: audio/wav\r\n\r\n"
+        ).encode() + data + b"\r\n"
+        for name, data in files
+    ]
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def post(path: str, chunks: list[bytes], content_length=None):
+    """
+    POST a body in chunks straight to the ASGI app.
+
+    Returns:
+        (status code, number of body chunks the app read)
+    """
+    headers = [(
+        b"content-type",
+        f"multipart/form-data; boundary={BOUNDARY}".encode()
+    )]
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("test", 0),
+        "server": ("test", 80),
+    }
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True}
+        for chunk in chunks
+    ] + [{"type": "http.request", "body": b"", "more_body": False}]
+    read = 0
+    sent = []
+
+    async def receive():
+        nonlocal read
+        if not messages:
+            return {"type": "http.disconnect"}
+        read += 1
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], read
+
+
+def test_oversized_content_length_is_refused_before_the_body_is_read():
+    max_bytes = upload_router.settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+
+    status, read = post(
+        "/api/v1/upload/base-track",
+        [b"x"],
+        content_length=2 * max_bytes
+    )
+
+    assert (status, read) == (413, 0)
+
+
+def test_chunked_body_is_cut_off_past_the_limit():
+    size_mb = upload_router.settings.MAX_UPLOAD_SIZE_MB + 5
+    body = multipart(("track.wav", b"x" * (size_mb * 1024 * 1024)))
+    chunks = [
+        body[i:i + 1024 * 1024] for i in range(0, len(body), 1024 * 1024)
+    ]
+    n_chunks = len(chunks)
+
+    status, read = post("/api/v1/upload/base-track", chunks)
+
+    assert status == 413
+    assert read < n_chunks
+
+
+class MemoryStorage:
+    def __init__(self):
+        self.objects = {}
+
+    def upload_stream(self, stream, remote_path):
+        self.objects[remote_path] = stream.read()
+
+
+class MemoryStyles:
+    rows = []
+
+    async def get_by_hash(self, file_hash):
+        for row in self.rows:
+            if row.file_hash == file_hash:
+                return row
+        return None
+
+    async def create(self, values):
+        self.rows.append(SimpleNamespace(**values))
+
+
+def test_duplicate_style_sound_is_never_uploaded(monkeypatch):
+    storage = MemoryStorage()
+    existing = SimpleNamespace(
+        id="existing",
+        name="kick.wav",
+        file_hash=hashlib.sha256(b"kick").hexdigest()
+    )
+    monkeypatch.setattr(MemoryStyles, "rows", [existing])
+    monkeypatch.setattr(upload_router, "get_storage", lambda: storage)
+    monkeypatch.setattr(upload_router, "StyleSoundRepository", MemoryStyles)
+
+    async def dispatch(*args):
+        pass
+
+    monkeypatch.setattr(upload_router, "dispatch", dispatch)
+    body = multipart(("kick.wav", b"kick"), ("snare.wav", b"snare"))
+
+    status, _ = post("/api/v1/upload/style-sound", [body], len(body))
+
+    assert status == 200
+    assert list(storage.objects.values()) == [b"snare"]
@@ -0,0 +1,40 @@
+# tests/test_websocket.py
+import asyncio
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from src.api.v1.websocket import router as ws_router
+from src.api.v1.websocket.manager import ConnectionManager
+
+
+class ClosedSocket:
+    """Socket whose pending receive fails the way a closed one does."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self):
+        raise self.error
+
+
+class NoProgress:
+    def get_json(self, key):
+        return None
+
+
+@pytest.mark.parametrize("error", [
+    WebSocketDisconnect(),
+    RuntimeError('Cannot call "receive" once a close message has been sent.'),
+])
+def test_track_drops_the_client_when_its_socket_closes(monkeypatch, error):
+    manager = ConnectionManager(queue_size=4, send_timeout=1)
+    monkeypatch.setattr(ws_router, "ws_manager", manager)
+    monkeypatch.setattr(ws_router, "get_cache", NoProgress)
+
+    asyncio.run(ws_router._track(ClosedSocket(error), "mix:m"))
+
+    assert manager.connections == {}